@@ -0,0 +1,284 @@
+"""
+Admission control for tool calls and snippet ingestion.
+
+Two mechanisms keep the server responsive under bursts:
+
+* Token-bucket rate limits keyed by client (remote address or MCP session)
+  and by tool name.  A call that finds its bucket empty is rejected at once
+  with a ``retry_after`` hint instead of queueing behind slower work.
+* A bounded ingest gate.  At most ``concurrency`` ingests run the LLM/registry
+  pipeline at a time and at most ``queue`` more may wait for a slot; anything
+  beyond that is rejected as overloaded.
+
+Limits are read from the environment by :meth:`AdmissionController.from_env`:
+
+``MCPFORGE_CLIENT_RATE`` / ``MCPFORGE_CLIENT_BURST``
+    Requests per second and bucket size per client (``0`` disables).
+``MCPFORGE_TOOL_RATE`` / ``MCPFORGE_TOOL_BURST``
+    Default calls per second and bucket size per tool (``0`` disables).
+``MCPFORGE_TOOL_LIMITS``
+    Per-tool overrides, e.g. ``"heavy=2:4,collector.ingest_python=1:2"``
+    (``name=rate:burst``).
+``MCPFORGE_INGEST_CONCURRENCY`` / ``MCPFORGE_INGEST_QUEUE``
+    Concurrent ingests and waiting ingests (defaults ``4`` and ``16``).
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Tuple
+
+
+class AdmissionError(Exception):
+    """Base class for rejected requests; carries an HTTP status and retry hint."""
+
+    status = 503
+
+    def __init__(self, message: str, retry_after: float = 1.0) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimited(AdmissionError):
+    """A client or tool exceeded its token-bucket rate."""
+
+    status = 429
+
+
+class Overloaded(AdmissionError):
+    """The ingest queue is full."""
+
+    status = 503
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``rate`` tokens/second."""
+
+    def __init__(self, rate: float, burst: float) -> None:
+        import threading
+        import time
+        self.rate = rate
+        self.capacity = max(burst, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, cost: float = 1.0) -> float:
+        """
+        Take ``cost`` tokens if available.
+
+        Returns ``0.0`` when admitted, otherwise the number of seconds until
+        enough tokens will have accumulated.  Costs above the bucket size are
+        clamped so large batches are throttled rather than rejected forever.
+        """
+        import time
+        cost = min(cost, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= cost:
+                self.tokens -= cost
+                return 0.0
+            return (cost - self.tokens) / self.rate
+
+
+class KeyedRateLimiter:
+    """A family of token buckets keyed by string, with bounded key memory."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        overrides: Dict[str, Tuple[float, float]] | None = None,
+        max_keys: int = 10000,
+    ) -> None:
+        import collections
+        import threading
+        self.rate = rate
+        self.burst = burst
+        self.overrides = overrides or {}
+        self.max_keys = max_keys
+        self._buckets: "collections.OrderedDict[str, TokenBucket]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _limits(self, key: str) -> Tuple[float, float]:
+        return self.overrides.get(key, (self.rate, self.burst))
+
+    def try_acquire(self, key: str, cost: float = 1.0) -> float:
+        """Charge ``cost`` to ``key``'s bucket; see :meth:`TokenBucket.try_acquire`."""
+        rate, burst = self._limits(key)
+        if rate <= 0:
+            return 0.0
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(rate, burst or rate)
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+        return bucket.try_acquire(cost)
+
+
+class IngestGate:
+    """Cap concurrent ingests and reject immediately once the wait queue is full."""
+
+    def __init__(self, concurrency: int, queue: int) -> None:
+        import threading
+        self.concurrency = max(concurrency, 1)
+        self.queue = max(queue, 0)
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of ingests running or waiting for a slot."""
+        return self._pending
+
+    def admit(self):
+        """
+        Return a context manager that holds an ingest slot.
+
+        Raises :class:`Overloaded` without blocking when ``concurrency`` ingests
+        are running and ``queue`` more are already waiting.
+        """
+        import contextlib
+
+        reservation = self.reserve()
+
+        @contextlib.contextmanager
+        def _admitted():
+            with reservation, self.slot():
+                yield
+
+        return _admitted()
+
+    def reserve(self):
+        """
+        Count an ingest as pending without taking a slot.
+
+        Raises :class:`Overloaded` like :meth:`admit`.  The returned context
+        manager releases the reservation on exit; take the slot itself with
+        :meth:`slot` when the work is about to run.
+        """
+        import contextlib
+
+        with self._lock:
+            if self._pending >= self.concurrency + self.queue:
+                raise Overloaded(
+                    f"ingest queue full ({self._pending} pending); try again later",
+                    retry_after=1.0,
+                )
+            self._pending += 1
+
+        @contextlib.contextmanager
+        def _reserved():
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self._pending -= 1
+
+        return _reserved()
+
+    def slot(self):
+        """Return a context manager that waits for and holds one ingest slot."""
+        return self._slots
+
+
+class AdmissionController:
+    """Bundle the per-client and per-tool limiters with the ingest gate."""
+
+    def __init__(
+        self,
+        client_limiter: KeyedRateLimiter,
+        tool_limiter: KeyedRateLimiter,
+        ingest_gate: IngestGate,
+    ) -> None:
+        self.clients = client_limiter
+        self.tools = tool_limiter
+        self.ingest_gate = ingest_gate
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """Build a controller from the ``MCPFORGE_*`` variables documented above."""
+        import os
+
+        def _num(name: str, default: float) -> float:
+            raw = os.getenv(name)
+            return float(raw) if raw not in (None, "") else default
+
+        overrides: Dict[str, Tuple[float, float]] = {}
+        for item in os.getenv("MCPFORGE_TOOL_LIMITS", "").split(","):
+            if "=" not in item:
+                continue
+            name, _, spec = item.partition("=")
+            rate, _, burst = spec.partition(":")
+            overrides[name.strip()] = (float(rate), float(burst or rate))
+        return cls(
+            KeyedRateLimiter(_num("MCPFORGE_CLIENT_RATE", 0), _num("MCPFORGE_CLIENT_BURST", 0)),
+            KeyedRateLimiter(_num("MCPFORGE_TOOL_RATE", 0), _num("MCPFORGE_TOOL_BURST", 0), overrides),
+            IngestGate(
+                int(_num("MCPFORGE_INGEST_CONCURRENCY", 4)),
+                int(_num("MCPFORGE_INGEST_QUEUE", 16)),
+            ),
+        )
+
+    def check_call(self, client: str | None, tool_name: str, cost: float = 1.0) -> None:
+        """Raise :class:`RateLimited` if ``client`` or ``tool_name`` is over its rate."""
+        wait = self.clients.try_acquire(client or "anonymous", 1.0)
+        if wait:
+            raise RateLimited(f"client rate limit exceeded; retry after {wait:.2f}s", retry_after=wait)
+        wait = self.tools.try_acquire(tool_name, cost)
+        if wait:
+            raise RateLimited(f"tool '{tool_name}' rate limit exceeded; retry after {wait:.2f}s", retry_after=wait)
+
+    def charge_tool(self, tool_name: str, cost: float) -> None:
+        """Charge ``cost`` calls to ``tool_name`` alone, e.g. for a batch of items."""
+        wait = self.tools.try_acquire(tool_name, cost)
+        if wait:
+            raise RateLimited(f"tool '{tool_name}' rate limit exceeded; retry after {wait:.2f}s", retry_after=wait)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the ingest gate for health reporting."""
+        return {
+            "ingest_pending": self.ingest_gate.pending,
+            "ingest_concurrency": self.ingest_gate.concurrency,
+            "ingest_queue": self.ingest_gate.queue,
+        }
+
+
+def current_client() -> str | None:
+    """Identify the caller of the current MCP request by address or session."""
+    def _impl() -> str | None:
+        try:
+            from fastmcp.server.dependencies import get_http_request
+            request = get_http_request()
+            if request.client:
+                return request.client.host
+        except RuntimeError:
+            pass
+        try:
+            from fastmcp.server.dependencies import get_context
+            return get_context().session_id
+        except (RuntimeError, ValueError):
+            return None
+    return _impl()
+
+
+def admission_middleware(controller: AdmissionController):
+    """Return FastMCP middleware that rate-limits ``tools/call`` requests."""
+    def _impl():
+        from fastmcp.server.middleware import Middleware
+        from fastmcp.exceptions import ToolError
+
+        class _AdmissionMiddleware(Middleware):
+            async def on_call_tool(self, context, call_next):
+                try:
+                    controller.check_call(current_client(), context.message.name)
+                except AdmissionError as exc:
+                    raise ToolError(str(exc)) from exc
+                return await call_next(context)
+
+        return _AdmissionMiddleware()
+    return _impl()
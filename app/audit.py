@@ -0,0 +1,372 @@
+"""
+Buffered audit log of tool calls and ingests.
+
+Callers hand records to :meth:`AuditLog.record`, which only puts them on a
+bounded in-memory queue.  A background thread drains the queue in batches.
+It writes each batch to the configured sink and folds it into per-minute
+aggregates, which :meth:`AuditLog.aggregates` reports.  No disk I/O happens on
+the calling thread.
+
+When the queue is full the ``drop`` policy discards the record and counts it.
+The ``block`` policy waits up to ``block_timeout`` seconds for room and then
+drops it.  Async callers use :meth:`AuditLog.arecord`, which does that wait on
+a worker thread so the event loop keeps serving other connections.
+
+Configuration is read by :meth:`AuditLog.from_env`:
+
+``MCPFORGE_AUDIT_LOG``
+    File to write (unset: aggregates only, nothing is written).  A ``.db`` /
+    ``.sqlite`` suffix selects SQLite; anything else is JSON Lines.
+``MCPFORGE_AUDIT_FORMAT``
+    ``jsonl`` or ``sqlite``, overriding the suffix.
+``MCPFORGE_AUDIT_BUFFER`` / ``MCPFORGE_AUDIT_BATCH``
+    Queue capacity and records per write (defaults ``10000`` and ``500``).
+``MCPFORGE_AUDIT_FLUSH_INTERVAL``
+    Seconds between flushes of a partial batch (default ``1.0``).
+``MCPFORGE_AUDIT_POLICY`` / ``MCPFORGE_AUDIT_BLOCK_TIMEOUT``
+    ``drop`` (default) or ``block``, and how long ``block`` may wait
+    (default ``0.05`` seconds).
+``MCPFORGE_AUDIT_MAX_BYTES`` / ``MCPFORGE_AUDIT_BACKUPS``
+    Rotate the file once it exceeds this size (default 64 MiB), keeping this
+    many old files as ``<file>.1`` … (default ``5``).
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List
+
+POLICIES = ("drop", "block")
+FIELDS = ("ts", "kind", "tool", "caller", "duration_ms", "in_bytes", "out_bytes", "outcome", "error", "source")
+# Per-minute aggregates older than this are discarded.
+AGGREGATE_WINDOW = 3600
+
+
+def _rotate(path: str, backups: int) -> None:
+    import os
+    if backups <= 0:
+        os.remove(path)
+        return
+    for i in range(backups - 1, 0, -1):
+        if os.path.exists(f"{path}.{i}"):
+            os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+    os.replace(path, f"{path}.1")
+
+
+class JsonlSink:
+    """Append records as JSON lines, rotating the file by size."""
+
+    def __init__(self, path: str, max_bytes: int = 64 << 20, backups: int = 5) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        import json
+        import os
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records))
+        if self.max_bytes and os.path.getsize(self.path) >= self.max_bytes:
+            _rotate(self.path, self.backups)
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteSink:
+    """Insert records into an ``audit`` table, rotating the database by size."""
+
+    def __init__(self, path: str, max_bytes: int = 64 << 20, backups: int = 5) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._db = None
+
+    def _open(self):
+        import sqlite3
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS audit (ts REAL, kind TEXT, tool TEXT, caller TEXT, "
+            "duration_ms REAL, in_bytes INTEGER, out_bytes INTEGER, outcome TEXT, error TEXT, source TEXT)"
+        )
+        return db
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        import os
+        if self._db is None:
+            self._db = self._open()
+        with self._db:
+            self._db.executemany(
+                f"INSERT INTO audit VALUES ({', '.join('?' * len(FIELDS))})",
+                [tuple(r.get(f) for f in FIELDS) for r in records],
+            )
+        if self.max_bytes and os.path.getsize(self.path) >= self.max_bytes:
+            self.close()
+            _rotate(self.path, self.backups)
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._db.close()
+            self._db = None
+
+
+def open_sink(path: str | None, fmt: str | None = None, max_bytes: int = 64 << 20, backups: int = 5):
+    """Return the sink for ``path`` (``None`` when no path is configured)."""
+    def _impl():
+        if not path:
+            return None
+        kind = (fmt or "").strip().lower() or (
+            "sqlite" if path.endswith((".db", ".sqlite", ".sqlite3")) else "jsonl"
+        )
+        if kind == "jsonl":
+            return JsonlSink(path, max_bytes, backups)
+        if kind == "sqlite":
+            return SqliteSink(path, max_bytes, backups)
+        raise ValueError(f"Unknown MCPFORGE_AUDIT_FORMAT: {kind!r}")
+    return _impl()
+
+
+class AuditLog:
+    """Queue audit records and write them in batches from a background thread."""
+
+    def __init__(
+        self,
+        sink=None,
+        buffer_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        policy: str = "drop",
+        block_timeout: float = 0.05,
+    ) -> None:
+        import atexit
+        import queue
+        import threading
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown audit policy: {policy!r}")
+        self.sink = sink
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self._queue: "queue.Queue[Dict[str, Any] | None]" = queue.Queue(maxsize=max(1, buffer_size))
+        self._lock = threading.Lock()
+        self._buckets: Dict[tuple, Dict[str, Any]] = {}
+        self.written = 0
+        self.dropped = 0
+        self.failed_writes = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="mcpforge-audit", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls) -> "AuditLog":
+        """Build a log from the ``MCPFORGE_AUDIT_*`` variables documented above."""
+        import os
+
+        def _num(name: str, default: float) -> float:
+            raw = os.getenv(name)
+            return float(raw) if raw not in (None, "") else default
+
+        sink = open_sink(
+            os.getenv("MCPFORGE_AUDIT_LOG"),
+            os.getenv("MCPFORGE_AUDIT_FORMAT"),
+            int(_num("MCPFORGE_AUDIT_MAX_BYTES", 64 << 20)),
+            int(_num("MCPFORGE_AUDIT_BACKUPS", 5)),
+        )
+        return cls(
+            sink,
+            buffer_size=int(_num("MCPFORGE_AUDIT_BUFFER", 10000)),
+            batch_size=int(_num("MCPFORGE_AUDIT_BATCH", 500)),
+            flush_interval=_num("MCPFORGE_AUDIT_FLUSH_INTERVAL", 1.0),
+            policy=(os.getenv("MCPFORGE_AUDIT_POLICY") or "drop").strip().lower(),
+            block_timeout=_num("MCPFORGE_AUDIT_BLOCK_TIMEOUT", 0.05),
+        )
+
+    def record(
+        self,
+        kind: str,
+        tool: str,
+        caller: str | None = None,
+        duration_ms: float = 0.0,
+        in_bytes: int = 0,
+        out_bytes: int = 0,
+        outcome: str = "ok",
+        error: str | None = None,
+        source: str | None = None,
+    ) -> bool:
+        """
+        Queue one record; return ``False`` if it was dropped.
+
+        ``source`` names the entry point (``mcp``, ``rest``, ``sync`` or
+        ``job``).
+        """
+        import queue
+        import time
+        entry = {
+            "ts": time.time(),
+            "kind": kind,
+            "tool": tool,
+            "caller": caller,
+            "duration_ms": round(duration_ms, 3),
+            "in_bytes": in_bytes,
+            "out_bytes": out_bytes,
+            "outcome": outcome,
+            "error": error,
+            "source": source,
+        }
+        try:
+            if self.policy == "block":
+                self._queue.put(entry, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    async def arecord(self, *args: Any, **kwargs: Any) -> bool:
+        """:meth:`record` for coroutines: a ``block`` wait runs off the event loop."""
+        import functools
+        import anyio
+        if self.policy != "block":
+            return self.record(*args, **kwargs)
+        return await anyio.to_thread.run_sync(functools.partial(self.record, *args, **kwargs))
+
+    def _run(self) -> None:
+        import queue
+        import time
+        while True:
+            batch: List[Dict[str, Any]] = []
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            if batch:
+                self._flush(batch)
+            if stop:
+                break
+
+    def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            if self.sink is not None:
+                self.sink.write(batch)
+        except Exception:  # keep serving calls if the disk is full or gone
+            with self._lock:
+                self.failed_writes += len(batch)
+        else:
+            with self._lock:
+                self.written += len(batch)
+        self._aggregate(batch)
+
+    def _aggregate(self, batch: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            for r in batch:
+                key = (int(r["ts"] // 60) * 60, r["kind"], r["tool"])
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = {
+                        "calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "in_bytes": 0, "out_bytes": 0,
+                        "sources": {},
+                    }
+                bucket["calls"] += 1
+                bucket["errors"] += r["outcome"] != "ok"
+                bucket["total_ms"] += r["duration_ms"]
+                bucket["max_ms"] = max(bucket["max_ms"], r["duration_ms"])
+                bucket["in_bytes"] += r["in_bytes"]
+                bucket["out_bytes"] += r["out_bytes"]
+                source = r.get("source") or "unknown"
+                bucket["sources"][source] = bucket["sources"].get(source, 0) + 1
+            oldest = (max(self._buckets)[0] if self._buckets else 0) - AGGREGATE_WINDOW
+            for key in [k for k in self._buckets if k[0] < oldest]:
+                del self._buckets[key]
+
+    def aggregates(self, window: float = 900) -> Dict[str, Any]:
+        """
+        Summarise records written in the last ``window`` seconds (at most an hour).
+
+        Returns totals per ``kind`` and tool (with a count per ``source``) plus
+        the log's own counters.  Records
+        still waiting in the queue are not included yet.
+        """
+        import time
+        since = time.time() - min(window, AGGREGATE_WINDOW)
+        tools: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for (minute, kind, tool), bucket in self._buckets.items():
+                if minute + 60 <= since:
+                    continue
+                row = tools.setdefault(f"{kind}:{tool}", {
+                    "kind": kind, "tool": tool, "calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "in_bytes": 0, "out_bytes": 0, "sources": {},
+                })
+                for field in ("calls", "errors", "total_ms", "in_bytes", "out_bytes"):
+                    row[field] += bucket[field]
+                row["max_ms"] = max(row["max_ms"], bucket["max_ms"])
+                for source, count in bucket["sources"].items():
+                    row["sources"][source] = row["sources"].get(source, 0) + count
+            stats = {
+                "queued": self._queue.qsize(),
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed_writes": self.failed_writes,
+                "policy": self.policy,
+                "sink": getattr(self.sink, "path", None),
+            }
+        rows = []
+        for row in sorted(tools.values(), key=lambda r: (-r["calls"], r["kind"], r["tool"])):
+            row["mean_ms"] = round(row.pop("total_ms") / row["calls"], 3)
+            row["max_ms"] = round(row["max_ms"], 3)
+            rows.append(row)
+        return {"window_seconds": min(window, AGGREGATE_WINDOW), "tools": rows, "log": stats}
+
+    def close(self) -> None:
+        """Flush everything queued so far and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(10)
+        if self.sink is not None:
+            self.sink.close()
+
+
+def audit_middleware(log: AuditLog):
+    """Return FastMCP middleware that records every ``tools/call`` in ``log``."""
+    def _impl():
+        import json
+        import time
+        from fastmcp.server.middleware import Middleware
+        from .admission import current_client
+
+        class _AuditMiddleware(Middleware):
+            async def on_call_tool(self, context, call_next):
+                started = time.perf_counter()
+                arguments = context.message.arguments or {}
+                in_bytes = len(json.dumps(arguments, default=str))
+                try:
+                    result = await call_next(context)
+                except Exception as exc:
+                    await log.arecord(
+                        "call", context.message.name, current_client(),
+                        (time.perf_counter() - started) * 1000, in_bytes, 0,
+                        "error", f"{type(exc).__name__}: {exc}"[:500], "mcp",
+                    )
+                    raise
+                out_bytes = sum(len(getattr(c, "text", "") or "") for c in getattr(result, "content", ()) or ())
+                await log.arecord(
+                    "call", context.message.name, current_client(),
+                    (time.perf_counter() - started) * 1000, in_bytes, out_bytes, source="mcp",
+                )
+                return result
+
+        return _AuditMiddleware()
+    return _impl()
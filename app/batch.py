@@ -0,0 +1,56 @@
+"""
+Batched invocation of a collected tool over many argument sets.
+
+A batch resolves the tool's snippet function once and applies it to every
+argument dict, optionally on a bounded thread pool.  Results come back in
+input order and each item succeeds or fails on its own, so one bad input
+does not sink the rest of the batch.
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Dict, List
+
+DEFAULT_MAX_ITEMS = 10000
+DEFAULT_MAX_PARALLEL = 8
+
+
+def batch_limits() -> Dict[str, int]:
+    """Return the item and parallelism caps from the environment."""
+    def _impl() -> Dict[str, int]:
+        import os
+        return {
+            "max_items": int(os.getenv("MCPFORGE_BATCH_MAX_ITEMS") or DEFAULT_MAX_ITEMS),
+            "max_parallel": int(os.getenv("MCPFORGE_BATCH_MAX_PARALLEL") or DEFAULT_MAX_PARALLEL),
+        }
+    return _impl()
+
+
+def run_batch(
+    call: Callable[[Dict[str, Any]], Any],
+    items: List[Any],
+    max_parallel: int = 1,
+) -> List[Dict[str, Any]]:
+    """
+    Apply ``call`` to every argument dict in ``items``.
+
+    Returns one ``{"ok": True, "result": ...}`` or ``{"ok": False, "error": ...}``
+    entry per item, in input order; items that are not dicts fail on their
+    own.  ``max_parallel`` above one runs items on
+    a thread pool of that size.
+    """
+    def _impl() -> List[Dict[str, Any]]:
+        def _one(args: Any) -> Dict[str, Any]:
+            if not isinstance(args, dict):
+                return {"ok": False, "error": "TypeError: batch items must be argument objects"}
+            try:
+                return {"ok": True, "result": call(args)}
+            except Exception as exc:
+                return {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+
+        if max_parallel <= 1 or len(items) <= 1:
+            return [_one(args) for args in items]
+        import concurrent.futures
+        workers = min(max_parallel, len(items))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mcpforge-batch") as pool:
+            return list(pool.map(_one, items))
+    return _impl()
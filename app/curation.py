@@ -0,0 +1,410 @@
+"""
+Local, LLM-free curation of snippet functions.
+
+The ingest pipeline normally asks the LLM which functions are safe to expose.
+For small, obviously pure functions that round trip is wasted latency and
+money, so :func:`curate_locally` first classifies every top-level function
+from the snippet's AST:
+
+* ``safe`` – only pure builtins, snippet-local helpers and allow-listed
+  standard-library modules are used, and every parameter has a simple type
+  annotation from which an example value can be derived;
+* ``unsafe`` – the function reaches for I/O, process control, dynamic code
+  execution or interpreter internals (any dunder name, attribute or string
+  literal, or a helper that looks attributes up by name);
+* ``unsure`` – anything the rules cannot vouch for (unknown imports or calls,
+  method calls on unknown objects, names not bound in the snippet, ``global``
+  writes, ``str.format`` templates, missing annotations, top-level side
+  effects, ...).
+
+When no exposed candidate is ``unsure`` the local verdict is final and tool
+names, descriptions and example parameters are generated here.  Otherwise the
+caller should fall back to the LLM.  ``MCPFORGE_CURATION`` selects the mode:
+``auto`` (default), ``llm`` (always ask the LLM) or ``local`` (never ask).
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, List, Tuple
+
+SAFE_MODULES = frozenset({
+    "math", "cmath", "statistics", "decimal", "fractions", "numbers", "random",
+    "re", "string", "textwrap", "unicodedata", "difflib",
+    "json", "base64", "binascii", "hashlib", "hmac", "zlib",
+    "datetime", "calendar", "time",
+    "collections", "itertools", "functools", "operator", "heapq", "bisect",
+    "copy", "dataclasses", "enum", "typing", "array",
+})
+
+UNSAFE_MODULES = frozenset({
+    "os", "sys", "subprocess", "shutil", "pathlib", "glob", "tempfile", "io",
+    "socket", "ssl", "http", "urllib", "requests", "httpx", "ftplib", "smtplib",
+    "ctypes", "cffi", "pickle", "marshal", "shelve", "dbm", "sqlite3",
+    "multiprocessing", "threading", "asyncio", "signal", "importlib", "builtins",
+    "inspect", "gc", "webbrowser", "code", "codeop", "pty", "resource",
+})
+
+UNSAFE_CALLS = frozenset({
+    "open", "exec", "eval", "compile", "__import__", "input", "breakpoint",
+    "globals", "locals", "vars", "setattr", "delattr", "exit", "quit", "help",
+    "memoryview",
+})
+
+SAFE_BUILTINS = frozenset({
+    "abs", "all", "any", "ascii", "bin", "bool", "bytes", "bytearray", "callable",
+    "chr", "complex", "dict", "divmod", "enumerate", "filter", "float", "format",
+    "frozenset", "hash", "hex", "id", "int", "isinstance",
+    "issubclass", "iter", "len", "list", "map", "max", "min", "next", "object",
+    "oct", "ord", "pow", "print", "range", "repr", "reversed", "round", "set",
+    "slice", "sorted", "str", "sum", "tuple", "type", "zip",
+    "ValueError", "TypeError", "KeyError", "IndexError", "ZeroDivisionError",
+    "ArithmeticError", "RuntimeError", "Exception", "StopIteration",
+    "NotImplementedError", "OverflowError", "AssertionError",
+})
+
+#: Allow-listed module helpers that resolve attributes or evaluate code from
+#: strings (``attrgetter("__globals__")``, string annotations, ...).
+UNSAFE_HELPERS = frozenset({
+    "attrgetter", "methodcaller", "get_type_hints", "ForwardRef", "evaluate_forward_ref",
+})
+
+#: Methods that read attributes named inside a template string.
+TEMPLATE_METHODS = frozenset({"format", "format_map"})
+
+#: Free names besides :data:`SAFE_BUILTINS` a safe function may read.
+SAFE_NAMES = frozenset({"NotImplemented", "Ellipsis"})
+
+
+def _is_dunder(name: str) -> bool:
+    """Dunder names (``__class__``, ``__loader__``, ...) reach interpreter internals."""
+    return len(name) > 4 and name.startswith("__") and name.endswith("__")
+
+
+def _dunder_in(value: Any) -> str | None:
+    """Return the first dunder spelled out in a string or bytes literal, if any."""
+    import re
+    if isinstance(value, bytes):
+        value = value.decode("latin-1")
+    if not isinstance(value, str):
+        return None
+    match = re.search(r"__\w+?__", value)
+    return match.group(0) if match else None
+
+
+def curation_mode() -> str:
+    """Return the configured curation mode: ``auto``, ``llm`` or ``local``."""
+    def _impl() -> str:
+        import os
+        mode = os.getenv("MCPFORGE_CURATION", "auto").strip().lower()
+        return mode if mode in ("auto", "llm", "local") else "auto"
+    return _impl()
+
+
+def example_for(annotation, position: int = 0) -> Tuple[bool, Any]:
+    """
+    Derive an example value from an annotation AST node.
+
+    Numbers follow the parameter ``position`` (``1, 2, 3, ...``) so examples
+    for multi-argument functions are distinguishable.  Returns ``(ok, value)``; ``ok`` is ``False`` when the annotation is
+    missing or not one of the simple types this engine understands.
+    """
+    def _impl() -> Tuple[bool, Any]:
+        import ast
+        node = annotation
+        if node is None:
+            return False, None
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            # String (forward-reference) annotations
+            try:
+                node = ast.parse(node.value, mode="eval").body
+            except SyntaxError:
+                return False, None
+        name, inner = _type_parts(node)
+        if name in ("Optional",) and inner:
+            return example_for(inner[0], position)
+        if name in ("int",):
+            return True, position + 1
+        if name in ("float",):
+            return True, position + 1.5
+        if name in ("str",):
+            return True, "example"
+        if name in ("bool",):
+            return True, True
+        if name in ("list", "List", "Sequence", "Iterable", "tuple", "Tuple", "set", "Set"):
+            if not inner:
+                return True, [1, 2]
+            ok, value = example_for(inner[0], position)
+            return ok, [value, value] if ok else None
+        if name in ("dict", "Dict", "Mapping"):
+            return True, {}
+        return False, None
+    return _impl()
+
+
+def _type_parts(node) -> Tuple[str, List[Any]]:
+    """Split ``List[int]`` / ``int | None`` style annotations into a name and arguments."""
+    import ast
+    if isinstance(node, ast.Name):
+        return node.id, []
+    if isinstance(node, ast.Attribute):
+        return node.attr, []
+    if isinstance(node, ast.Subscript):
+        base, _ = _type_parts(node.value)
+        sl = node.slice
+        args = list(sl.elts) if isinstance(sl, ast.Tuple) else [sl]
+        return base, args
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        # ``X | None`` behaves like ``Optional[X]``
+        for side in (node.left, node.right):
+            if not (isinstance(side, ast.Constant) and side.value is None):
+                return "Optional", [side]
+    return "", []
+
+
+def _module_root(name: str | None) -> str:
+    return (name or "").split(".")[0]
+
+
+def _classify_import(root: str, reasons: List[str]) -> str:
+    if root in SAFE_MODULES:
+        return "safe"
+    if root in UNSAFE_MODULES:
+        reasons.append(f"imports {root}")
+        return "unsafe"
+    reasons.append(f"imports unknown module {root}")
+    return "unsure"
+
+
+def _worst(*verdicts: str) -> str:
+    order = {"safe": 0, "unsure": 1, "unsafe": 2}
+    return max(verdicts, key=lambda v: order[v]) if verdicts else "safe"
+
+
+def analyze_snippet(code: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Classify every top-level function in ``code``.
+
+    Returns ``{name: {"verdict": ..., "reasons": [...], "examples": {...}}}``
+    where ``examples`` is only meaningful for ``safe`` functions.
+    """
+    def _impl() -> Dict[str, Dict[str, Any]]:
+        import ast
+        import textwrap
+        try:
+            tree = ast.parse(textwrap.dedent(code))
+        except SyntaxError:
+            return {}
+
+        # Module level: collect imports and flag statements that run on exec.
+        module_verdict = "safe"
+        module_reasons: List[str] = []
+        # Bound name -> (verdict, reasons) for module-level imports.  Known
+        # unsafe modules only taint the functions that use them; unknown
+        # modules taint everything because importing them runs their code.
+        imported: Dict[str, Tuple[str, List[str]]] = {}
+        funcs: Dict[str, Any] = {}
+        module_names: set = set()
+        for node in tree.body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                for alias in node.names:
+                    root = _module_root(alias.name if isinstance(node, ast.Import) else node.module)
+                    reasons_for: List[str] = []
+                    verdict_for = _classify_import(root, reasons_for)
+                    if verdict_for == "unsure":
+                        module_verdict = _worst(module_verdict, verdict_for)
+                        module_reasons.extend(reasons_for)
+                    imported[(alias.asname or alias.name).split(".")[0]] = (verdict_for, reasons_for)
+            elif isinstance(node, ast.FunctionDef):
+                funcs[node.name] = node
+            elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
+                continue  # docstring
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)) and isinstance(
+                getattr(node, "value", None), (ast.Constant, ast.Tuple, ast.List, ast.Dict, ast.Set)
+            ):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                module_names.update(n.id for t in targets for n in ast.walk(t) if isinstance(n, ast.Name))
+                continue  # constant tables
+            else:
+                module_verdict = _worst(module_verdict, "unsure")
+                module_reasons.append(f"top-level {type(node).__name__} statement runs on load")
+
+        results: Dict[str, Dict[str, Any]] = {}
+        calls_between: Dict[str, List[str]] = {}
+        for name, fn in funcs.items():
+            reasons = list(module_reasons)
+            verdict = module_verdict
+            local_names = {a.arg for a in fn.args.posonlyargs + fn.args.args + fn.args.kwonlyargs}
+            callees: List[str] = []
+            first = fn.body[0] if fn.body else None
+            docstring = first.value if isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant) else None
+            if fn.args.vararg or fn.args.kwarg:
+                verdict = _worst(verdict, "unsure")
+                reasons.append("uses *args/**kwargs")
+            for sub in ast.walk(fn):
+                if isinstance(sub, (ast.Assign, ast.AugAssign, ast.AnnAssign, ast.For, ast.comprehension)):
+                    targets = sub.targets if isinstance(sub, ast.Assign) else [sub.target]
+                    for t in targets:
+                        local_names.update(n.id for n in ast.walk(t) if isinstance(n, ast.Name))
+                elif isinstance(sub, (ast.With, ast.AsyncWith)):
+                    for item in sub.items:
+                        if item.optional_vars is not None:
+                            local_names.update(n.id for n in ast.walk(item.optional_vars) if isinstance(n, ast.Name))
+                elif isinstance(sub, ast.ExceptHandler) and sub.name:
+                    local_names.add(sub.name)
+                elif isinstance(sub, ast.NamedExpr):
+                    local_names.add(sub.target.id)
+                elif isinstance(sub, (ast.FunctionDef, ast.Lambda)) and sub is not fn:
+                    nested = sub.args
+                    local_names.update(a.arg for a in nested.posonlyargs + nested.args + nested.kwonlyargs)
+                    local_names.update(a.arg for a in (nested.vararg, nested.kwarg) if a is not None)
+                    if isinstance(sub, ast.FunctionDef):
+                        local_names.add(sub.name)
+                elif isinstance(sub, ast.ClassDef):
+                    local_names.add(sub.name)
+            # Names a safe function may read without further checks
+            bound = local_names | set(funcs) | set(imported) | module_names | SAFE_BUILTINS | SAFE_NAMES
+            for sub in ast.walk(fn):
+                if isinstance(sub, (ast.Import, ast.ImportFrom)):
+                    mods = [a.name for a in sub.names] if isinstance(sub, ast.Import) else [sub.module]
+                    for mod in mods:
+                        verdict = _worst(verdict, _classify_import(_module_root(mod), reasons))
+                    for alias in sub.names:
+                        local_names.add((alias.asname or alias.name).split(".")[0])
+                elif isinstance(sub, (ast.Global, ast.Nonlocal)):
+                    verdict = _worst(verdict, "unsure")
+                    reasons.append(f"writes {'global' if isinstance(sub, ast.Global) else 'nonlocal'} state")
+                elif isinstance(sub, (ast.Yield, ast.YieldFrom, ast.Await)):
+                    verdict = _worst(verdict, "unsure")
+                    reasons.append("is a generator or coroutine")
+                elif isinstance(sub, ast.Attribute) and _is_dunder(sub.attr):
+                    verdict = "unsafe"
+                    reasons.append(f"touches {sub.attr}")
+                elif isinstance(sub, ast.Name) and _is_dunder(sub.id):
+                    verdict = "unsafe"
+                    reasons.append(f"touches {sub.id}")
+                elif isinstance(sub, ast.Constant) and sub is not docstring and _dunder_in(sub.value):
+                    # ``attrgetter("__globals__")``, ``"{0.__class__}".format(x)``
+                    # and string annotations all turn literals into lookups.
+                    verdict = "unsafe"
+                    reasons.append(f"mentions {_dunder_in(sub.value)} in a string")
+                elif isinstance(sub, ast.Attribute) and sub.attr in UNSAFE_HELPERS:
+                    verdict = "unsafe"
+                    reasons.append(f"uses {sub.attr}")
+                elif isinstance(sub, ast.Name) and sub.id in UNSAFE_HELPERS:
+                    verdict = "unsafe"
+                    reasons.append(f"uses {sub.id}")
+                elif isinstance(sub, ast.Attribute) and sub.attr in TEMPLATE_METHODS:
+                    verdict = _worst(verdict, "unsure")
+                    reasons.append(f"uses str.{sub.attr}() templates")
+                elif isinstance(sub, ast.Name) and sub.id in UNSAFE_CALLS and sub.id not in local_names:
+                    # Covers ``f = open`` as well as direct calls
+                    verdict = "unsafe"
+                    if f"calls {sub.id}()" not in reasons:
+                        reasons.append(f"uses {sub.id}")
+                elif isinstance(sub, ast.Name) and sub.id in imported and sub.id not in local_names:
+                    used_verdict, used_reasons = imported[sub.id]
+                    if used_verdict != "safe" and used_reasons[0] not in reasons:
+                        verdict = _worst(verdict, used_verdict)
+                        reasons.extend(used_reasons)
+                elif isinstance(sub, ast.Call) and isinstance(sub.func, ast.Name):
+                    callee = sub.func.id
+                    if callee in UNSAFE_CALLS:
+                        verdict = "unsafe"
+                        reasons.append(f"calls {callee}()")
+                    elif callee in funcs:
+                        callees.append(callee)
+                    elif callee not in SAFE_BUILTINS and callee not in local_names and callee not in imported:
+                        verdict = _worst(verdict, "unsure")
+                        reasons.append(f"calls unknown {callee}()")
+                elif isinstance(sub, ast.Call) and isinstance(sub.func, ast.Attribute):
+                    # Method calls are only vouched for on parameters, locals,
+                    # allow-listed modules and builtin types.
+                    base = sub.func.value
+                    while isinstance(base, ast.Attribute):
+                        base = base.value
+                    if isinstance(base, ast.Name) and base.id not in (
+                        local_names | set(imported) | module_names | SAFE_BUILTINS
+                    ):
+                        verdict = _worst(verdict, "unsure")
+                        reasons.append(f"calls {sub.func.attr}() on unknown {base.id}")
+                elif (
+                    isinstance(sub, ast.Name)
+                    and isinstance(sub.ctx, ast.Load)
+                    and sub.id not in bound
+                    and f"calls unknown {sub.id}()" not in reasons
+                    and not any(r.endswith(f" on unknown {sub.id}") for r in reasons)
+                ):
+                    verdict = _worst(verdict, "unsure")
+                    reasons.append(f"uses unbound name {sub.id}")
+            examples: Dict[str, Any] = {}
+            for position, arg in enumerate(fn.args.args):
+                ok, value = example_for(arg.annotation, position)
+                if not ok:
+                    verdict = _worst(verdict, "unsure")
+                    reasons.append(f"parameter {arg.arg} lacks a simple type annotation")
+                examples[arg.arg] = value
+            # Explicit literal defaults make better examples than synthetic ones.
+            defaults = fn.args.defaults
+            for arg, default in zip(fn.args.args[len(fn.args.args) - len(defaults):], defaults):
+                if isinstance(default, ast.Constant) and default.value is not None:
+                    examples[arg.arg] = default.value
+            calls_between[name] = callees
+            results[name] = {"verdict": verdict, "reasons": reasons, "examples": examples}
+
+        # A function is no safer than the snippet helpers it calls.
+        changed = True
+        while changed:
+            changed = False
+            for name, callees in calls_between.items():
+                worst = _worst(results[name]["verdict"], *(results[c]["verdict"] for c in callees))
+                if worst != results[name]["verdict"]:
+                    results[name]["verdict"] = worst
+                    results[name]["reasons"].append("calls a helper that is not safe")
+                    changed = True
+        return results
+    return _impl()
+
+
+def _describe(func: Dict[str, Any]) -> str:
+    """Build a one-line description from the docstring or the function name."""
+    doc = (func.get("doc") or "").strip().splitlines()
+    if doc and doc[0].strip():
+        return doc[0].strip()[:120]
+    words = func["name"].strip("_").replace("_", " ") or func["name"]
+    args = [a for a, _t in func.get("args", [])]
+    if args:
+        return f"{words.capitalize()} given {', '.join(args)}."[:120]
+    return f"{words.capitalize()}."[:120]
+
+
+def curate_locally(code: str, funcs: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]] | None, Dict[str, Any]]:
+    """
+    Decide which of ``funcs`` to expose without the LLM.
+
+    Returns ``(chosen, report)``.  ``chosen`` uses the same shape as
+    :func:`app.llm.choose_tools_with_gpt` and is ``None`` when the engine is
+    unsure and the LLM should be consulted.  ``report`` maps each function
+    name to its verdict and reasons.
+    """
+    def _impl() -> Tuple[List[Dict[str, Any]] | None, Dict[str, Any]]:
+        analysis = analyze_snippet(code)
+        report = {
+            name: {"verdict": info["verdict"], "reasons": info["reasons"]}
+            for name, info in analysis.items()
+        }
+        # Underscore-prefixed helpers are never exposed, so their verdict only
+        # matters through the functions that call them.
+        candidates = [f for f in funcs if not f["name"].startswith("_") and f["name"] in analysis]
+        if not candidates or any(analysis[f["name"]]["verdict"] == "unsure" for f in candidates):
+            return None, report
+        chosen = [
+            {
+                "original_name": f["name"],
+                "tool_name": f["name"],
+                "description": _describe(f),
+                "example_params": analysis[f["name"]]["examples"],
+            }
+            for f in candidates
+            if analysis[f["name"]]["verdict"] == "safe"
+        ]
+        return chosen, report
+    return _impl()
@@ -0,0 +1,264 @@
+"""
+Snippet execution in forked worker processes.
+
+By default collected tools run inside the server process.  With
+``MCPFORGE_EXECUTION=forkserver`` calls are sent instead to a long-lived
+template process.  That process is started once with the ``spawn`` method. It
+imports the modules from :data:`DEFAULT_PRELOAD` plus any listed in
+``MCPFORGE_FORKSERVER_PRELOAD`` and compiles every registered snippet.  Its
+workers are then forked from it, so each starts with those imports and code
+objects already in memory and shares their pages copy-on-write.  When the set of
+snippets changes the template compiles the new ones and re-forks its workers.
+
+``MCPFORGE_FORKSERVER_WORKERS`` sets the worker count (default: CPU count,
+at most 4).
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List
+
+MODES = ("inprocess", "forkserver")
+
+# Standard library modules snippets commonly import.
+DEFAULT_PRELOAD = (
+    "collections",
+    "datetime",
+    "decimal",
+    "fractions",
+    "functools",
+    "itertools",
+    "json",
+    "math",
+    "random",
+    "re",
+    "statistics",
+    "string",
+)
+
+# Template/worker state: compiled snippet code by source key.  Workers inherit
+# this from the template when they are forked.
+_CODE: Dict[str, Any] = {}
+
+
+def execution_mode() -> str:
+    """Return the configured execution mode (``inprocess`` or ``forkserver``)."""
+    def _impl() -> str:
+        import os
+        mode = (os.getenv("MCPFORGE_EXECUTION") or "inprocess").strip().lower()
+        if mode not in MODES:
+            raise ValueError(f"Unknown MCPFORGE_EXECUTION mode: {mode!r}")
+        return mode
+    return _impl()
+
+
+def preload_modules() -> List[str]:
+    """Return the modules the template imports before forking workers."""
+    def _impl() -> List[str]:
+        import os
+        extra = [m.strip() for m in os.getenv("MCPFORGE_FORKSERVER_PRELOAD", "").split(",") if m.strip()]
+        return list(dict.fromkeys([*DEFAULT_PRELOAD, *extra]))
+    return _impl()
+
+
+def source_key(source: str) -> str:
+    """Return the cache key for a snippet's source."""
+    def _impl() -> str:
+        import hashlib
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()
+    return _impl()
+
+
+def _compile_all(sources: Dict[str, str]) -> None:
+    for key, source in sources.items():
+        if key not in _CODE:
+            _CODE[key] = compile(source, f"<snippet {key[:12]}>", "exec")
+    for key in set(_CODE) - set(sources):
+        del _CODE[key]
+
+
+def _call(key: str, func_name: str, kwargs: Dict[str, Any]) -> Any:
+    """Worker entry point: run ``func_name`` from a precompiled snippet."""
+    import types
+    code = _CODE.get(key)
+    if code is None:
+        raise LookupError("snippet is not loaded in the fork server")
+    ns: Dict[str, Any] = {}
+    exec(code, ns)
+    target = ns.get(func_name)
+    if not isinstance(target, types.FunctionType):
+        raise ValueError(f"Expected function '{func_name}' not found in snippet.")
+    return target(**kwargs)
+
+
+def _template_main(conn, preload: Iterable[str], workers: int) -> None:
+    """Template process loop: preload, compile snippets and dispatch calls to forked workers."""
+    import concurrent.futures
+    import importlib
+    import multiprocessing
+    import threading
+    from concurrent.futures.process import BrokenProcessPool
+
+    for name in preload:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+    send_lock = threading.Lock()
+    pool = None
+
+    def _reply(call_id: int, future) -> None:
+        exc = future.exception()
+        msg = ("ok", call_id, future.result()) if exc is None else ("err", call_id, exc)
+        with send_lock:
+            try:
+                conn.send(msg)
+            except Exception as send_exc:  # unpicklable result or exception
+                conn.send(("err", call_id, RuntimeError(f"{type(send_exc).__name__}: {send_exc}")))
+
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            break
+        op = msg[0]
+        if op == "load":
+            _compile_all(msg[1])
+            if pool is not None:
+                # Retire the old workers; new ones fork with the fresh code.
+                pool.shutdown(wait=False)
+                pool = None
+            with send_lock:
+                conn.send(("loaded", msg[2], None))
+        elif op == "call":
+            _, call_id, key, func_name, kwargs = msg
+            if pool is None or getattr(pool, "_broken", False):
+                pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context("fork")
+                )
+            try:
+                future = pool.submit(_call, key, func_name, kwargs)
+            except BrokenProcessPool as exc:
+                pool = None
+                with send_lock:
+                    conn.send(("err", call_id, RuntimeError(f"BrokenProcessPool: {exc}")))
+                continue
+            future.add_done_callback(lambda f, cid=call_id: _reply(cid, f))
+        elif op == "stop":
+            break
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+class ForkServerRunner:
+    """Run snippet functions in workers forked from a preloaded template process."""
+
+    def __init__(self, preload: Iterable[str] | None = None, workers: int | None = None) -> None:
+        import atexit
+        import os
+        import threading
+        self.preload = list(preload) if preload is not None else preload_modules()
+        env_workers = os.getenv("MCPFORGE_FORKSERVER_WORKERS")
+        self.workers = max(1, workers or int(env_workers or 0) or min(os.cpu_count() or 1, 4))
+        self._lock = threading.Lock()
+        self._pending: Dict[int, Any] = {}
+        self._sources: Dict[str, str] = {}
+        self._next_id = 0
+        self._conn = None
+        self._proc = None
+        atexit.register(self.close)
+
+    def _ensure_started(self) -> bool:
+        # Caller holds ``self._lock``.  Returns ``True`` if the template was
+        # (re)started, in which case the current sources were already sent.
+        import multiprocessing
+        import threading
+        if self._proc is not None and self._proc.is_alive():
+            return False
+        ctx = multiprocessing.get_context("spawn")
+        parent, child = ctx.Pipe()
+        self._proc = ctx.Process(
+            target=_template_main,
+            args=(child, self.preload, self.workers),
+            name="mcpforge-forkserver",
+            # Not a daemon: daemonic processes may not fork workers.  The
+            # template exits when its pipe closes, and ``close`` runs at exit.
+            daemon=False,
+        )
+        self._proc.start()
+        child.close()
+        self._conn = parent
+        threading.Thread(target=self._read_replies, args=(parent,), name="mcpforge-forkserver-reader", daemon=True).start()
+        if self._sources:
+            self._send_load()
+        return True
+
+    def _read_replies(self, conn) -> None:
+        while True:
+            try:
+                status, call_id, value = conn.recv()
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                future = self._pending.pop(call_id, None)
+            if future is None:
+                continue
+            if status == "err":
+                future.set_exception(value)
+            else:
+                future.set_result(value)
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._conn is conn:
+                self._conn = None
+                self._proc = None
+        for future in pending.values():
+            future.set_exception(RuntimeError("fork server exited"))
+
+    def _send_load(self) -> None:
+        # Caller holds ``self._lock``; the reply is only used to order calls.
+        import concurrent.futures
+        self._next_id += 1
+        self._pending[self._next_id] = concurrent.futures.Future()
+        self._conn.send(("load", dict(self._sources), self._next_id))
+
+    def load(self, sources: Iterable[str]) -> None:
+        """Make exactly ``sources`` available to workers, compiling them in the template."""
+        with self._lock:
+            self._sources = {source_key(s): s for s in sources}
+            if not self._ensure_started():
+                self._send_load()
+
+    def call(self, source: str, func_name: str, kwargs: Dict[str, Any], timeout: float | None = None) -> Any:
+        """Run ``func_name`` from ``source`` with ``kwargs`` in a worker and return its result."""
+        import concurrent.futures
+        key = source_key(source)
+        future = concurrent.futures.Future()
+        # One critical section, so no ``load`` can drop the source between the
+        # check and the call.
+        with self._lock:
+            if key not in self._sources:
+                self._sources[key] = source
+                if not self._ensure_started():
+                    self._send_load()
+            else:
+                self._ensure_started()
+            self._next_id += 1
+            self._pending[self._next_id] = future
+            self._conn.send(("call", self._next_id, key, func_name, kwargs))
+        return future.result(timeout)
+
+    def close(self) -> None:
+        """Stop the template process and its workers."""
+        with self._lock:
+            conn, proc = self._conn, self._proc
+            self._conn = self._proc = None
+        if conn is not None:
+            try:
+                conn.send(("stop",))
+            except OSError:
+                pass
+            conn.close()
+        if proc is not None:
+            proc.join(5)
+            if proc.is_alive():
+                proc.terminate()
@@ -0,0 +1,79 @@
+"""
+Background job queue for long-running operations such as snippet ingestion.
+
+Jobs run on a small thread pool.  Callers get a job ID back immediately and
+poll :meth:`JobQueue.get` for a snapshot of the job's state, which moves
+through ``queued`` → ``running`` → ``succeeded`` or ``failed``.  Finished
+jobs are kept for later polling up to a fixed count, oldest first out.
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Dict
+
+PENDING = ("queued", "running")
+
+
+class JobQueue:
+    """Run callables on worker threads and track their status by job ID."""
+
+    def __init__(self, workers: int = 2, max_finished: int = 256) -> None:
+        import collections
+        import concurrent.futures
+        import threading
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(workers, 1), thread_name_prefix="mcpforge-job"
+        )
+        self._lock = threading.Lock()
+        self._jobs: "collections.OrderedDict[str, Dict[str, Any]]" = collections.OrderedDict()
+        self.max_finished = max_finished
+
+    def submit(self, kind: str, fn: Callable[[], Any], **info: Any) -> str:
+        """Queue ``fn`` for execution and return the new job ID."""
+        import time
+        import uuid
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "kind": kind,
+            "status": "queued",
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+            **info,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+        self._pool.submit(self._run, job, fn)
+        return job_id
+
+    def _run(self, job: Dict[str, Any], fn: Callable[[], Any]) -> None:
+        import time
+        with self._lock:
+            job["status"] = "running"
+            job["started_at"] = time.time()
+        try:
+            result = fn()
+        except Exception as exc:  # reported to pollers instead of lost in the pool
+            update = {"status": "failed", "error": f"{type(exc).__name__}: {exc}"}
+        else:
+            update = {"status": "succeeded", "result": result}
+        with self._lock:
+            job.update(update, finished_at=time.time())
+            self._prune()
+
+    def _prune(self) -> None:
+        finished = [jid for jid, j in self._jobs.items() if j["status"] not in PENDING]
+        for jid in finished[: max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[jid]
+
+    def get(self, job_id: str) -> Dict[str, Any] | None:
+        """Return a copy of the job's current state, or ``None`` if unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def shutdown(self) -> None:
+        """Stop accepting jobs and wait for running ones to finish."""
+        self._pool.shutdown(wait=True)
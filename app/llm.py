@@ -6,8 +6,49 @@ to respect the user's preference that imports live inside function bodies.
 """
 
 from __future__ import annotations
+import threading
 from typing import List, Dict, Any
 
+# Shared OpenAI client, created on first use by ``get_client``.
+_CLIENT: Dict[str, Any] = {}
+_CLIENT_LOCK = threading.Lock()
+# Single-flight group coalescing identical concurrent LLM requests.
+_FLIGHTS: Dict[str, Any] = {}
+
+
+def _coalesced(kind: str, payload: Any, fn):
+    """Run ``fn`` once for concurrent calls with the same ``kind`` and ``payload``."""
+    def _impl():
+        from .singleflight import SingleFlight, content_key
+        flights = _FLIGHTS.get("group")
+        if flights is None:
+            # Built on first use only; ``setdefault`` keeps one group if two
+            # threads race here.
+            flights = _FLIGHTS.setdefault("group", SingleFlight())
+        result, _shared = flights.do(content_key(kind, payload), fn)
+        return result
+    return _impl()
+
+
+def get_client():
+    """
+    Return a process-wide OpenAI client, importing and constructing it lazily.
+
+    The ``openai`` package is only imported the first time a client is
+    needed, and the client (with its connection pool) is reused by every
+    later call.  A new client is built if ``OPENAI_API_KEY`` changes.
+    """
+    def _impl():
+        import os
+        api_key = os.getenv("OPENAI_API_KEY")
+        with _CLIENT_LOCK:
+            if _CLIENT.get("key") != api_key or "client" not in _CLIENT:
+                from openai import OpenAI
+                _CLIENT["client"] = OpenAI(api_key=api_key)
+                _CLIENT["key"] = api_key
+            return _CLIENT["client"]
+    return _impl()
+
 def choose_tools_with_gpt(code: str, fn_summaries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Ask OpenAI gpt-4.1-nano to select functions from ``fn_summaries`` to expose
@@ -42,6 +83,10 @@ def choose_tools_with_gpt(code: str, fn_summaries: List[Dict[str, Any]]) -> List
     def _call_openai() -> List[Dict[str, Any]]:
         import os
         if os.getenv("USE_MOCK_LLM"):
+            if os.getenv("MOCK_LLM_DELAY"):
+                # Simulate LLM latency in tests
+                import time
+                time.sleep(float(os.getenv("MOCK_LLM_DELAY")))
             name = os.getenv("MOCK_LLM_FUNCTION", fn_summaries[0]["name"]) if fn_summaries else "tool"
             # Generate simple example parameters based on the function's args
             summary = next((s for s in fn_summaries if s["name"] == name), fn_summaries[0]) if fn_summaries else {"args": []}
@@ -52,10 +97,8 @@ def choose_tools_with_gpt(code: str, fn_summaries: List[Dict[str, Any]]) -> List
                 "description": f"{name} tool",
                 "example_params": params,
             }]
-        # Deferred import: only import when the function is called.
-        from openai import OpenAI
         import json
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        client = get_client()
         # Compose a concise system prompt instructing the model to return JSON.
         system = (
             "You are a careful code curator. Given candidate Python functions, "
@@ -91,7 +134,7 @@ def choose_tools_with_gpt(code: str, fn_summaries: List[Dict[str, Any]]) -> List
             return obj
         return []
 
-    return _call_openai()
+    return _coalesced("choose", [code, fn_summaries], _call_openai)
 
 
 def rewrite_snippet_with_gpt(text: str) -> str:
@@ -102,8 +145,7 @@ def rewrite_snippet_with_gpt(text: str) -> str:
         if os.getenv("USE_MOCK_LLM"):
             # For tests, allow overriding the rewritten snippet
             return os.getenv("MOCK_LLM_SNIPPET", text)
-        from openai import OpenAI
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        client = get_client()
         system = (
             "You transform incomplete or pseudo-code into a complete, valid "
             "Python function snippet. Return only runnable Python code."
@@ -117,4 +159,4 @@ def rewrite_snippet_with_gpt(text: str) -> str:
         )
         return rsp.output_text
 
-    return _call_openai()
+    return _coalesced("rewrite", text, _call_openai)
@@ -0,0 +1,173 @@
+"""
+Opt-in per-tool profiling for collected tools.
+
+Profiling is off for every tool until an operator enables it (usually through
+the ``collector.profile`` admin tool).  For an enabled tool each call is timed.
+The slowest calls are kept with a digest of their arguments, and a
+``sample_rate`` fraction of calls run under :mod:`cProfile`.  Sampled
+profiles are merged into one :class:`pstats.Stats` per tool, which can be read
+as text or downloaded in the standard ``pstats`` dump format.
+
+A disabled tool costs one dictionary lookup per call.
+
+``MCPFORGE_PROFILE_SLOW_CALLS`` sets how many slow calls are kept per tool
+(default 20).
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Dict, List
+
+DEFAULT_SLOW_CALLS = 20
+
+
+def args_digest(arguments: Dict[str, Any]) -> str:
+    """Return a short stable digest of call arguments (values are not stored)."""
+    def _impl() -> str:
+        import hashlib
+        import json
+        blob = json.dumps(arguments, sort_keys=True, default=repr).encode("utf-8")
+        return hashlib.sha256(blob).hexdigest()[:16]
+    return _impl()
+
+
+class _ToolProfile:
+    def __init__(self, sample_rate: float) -> None:
+        self.sample_rate = sample_rate
+        self.calls = 0
+        self.sampled = 0
+        self.total_ms = 0.0
+        self.slowest: List[tuple] = []  # min-heap of (duration_ms, seq, entry)
+        self.stats = None
+
+
+class ToolProfiler:
+    """Time, sample and aggregate calls for the tools that have profiling enabled."""
+
+    def __init__(self, slow_calls: int | None = None) -> None:
+        import os
+        import threading
+        self.slow_calls = slow_calls or int(os.getenv("MCPFORGE_PROFILE_SLOW_CALLS") or DEFAULT_SLOW_CALLS)
+        self._lock = threading.Lock()
+        # Enabled tools only; the hot path checks membership here.
+        self._active: Dict[str, float] = {}
+        self._profiles: Dict[str, _ToolProfile] = {}
+        self._seq = 0
+
+    def enable(self, tool_name: str, sample_rate: float = 1.0, reset: bool = False) -> None:
+        """Start profiling ``tool_name``, running ``sample_rate`` of calls under cProfile."""
+        rate = min(max(sample_rate, 0.0), 1.0)
+        with self._lock:
+            profile = self._profiles.get(tool_name)
+            if profile is None or reset:
+                profile = self._profiles[tool_name] = _ToolProfile(rate)
+            profile.sample_rate = rate
+            self._active[tool_name] = rate
+
+    def disable(self, tool_name: str) -> None:
+        """Stop profiling ``tool_name``; collected data stays available."""
+        with self._lock:
+            self._active.pop(tool_name, None)
+
+    def clear(self, tool_name: str) -> None:
+        """Forget everything collected for ``tool_name``."""
+        with self._lock:
+            self._active.pop(tool_name, None)
+            self._profiles.pop(tool_name, None)
+
+    def watching(self, tool_name: str) -> bool:
+        """Whether calls to ``tool_name`` should go through :meth:`observe`."""
+        return tool_name in self._active
+
+    def observe(self, tool_name: str, arguments: Dict[str, Any], fn: Callable[..., Any]) -> Any:
+        """Call ``fn(**arguments)``, timing it and profiling it if sampled."""
+        import cProfile
+        import heapq
+        import random
+        import time
+        rate = self._active.get(tool_name, 0.0)
+        profiler = cProfile.Profile() if rate > 0 and (rate >= 1 or random.random() < rate) else None
+        ok = False
+        started = time.perf_counter()
+        try:
+            if profiler is not None:
+                try:
+                    profiler.enable()
+                except ValueError:  # another profiler is active on this thread
+                    profiler = None
+            try:
+                result = fn(**arguments)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+            ok = True
+            return result
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            entry = {
+                "duration_ms": round(duration_ms, 3),
+                "at": time.time(),
+                "args_digest": args_digest(arguments),
+                "profiled": profiler is not None,
+                "ok": ok,
+            }
+            with self._lock:
+                profile = self._profiles.get(tool_name)
+                if profile is not None:
+                    profile.calls += 1
+                    profile.total_ms += duration_ms
+                    self._seq += 1
+                    item = (duration_ms, self._seq, entry)
+                    if len(profile.slowest) < self.slow_calls:
+                        heapq.heappush(profile.slowest, item)
+                    elif duration_ms > profile.slowest[0][0]:
+                        heapq.heapreplace(profile.slowest, item)
+                    if profiler is not None:
+                        profile.sampled += 1
+                        self._merge(profile, profiler)
+
+    @staticmethod
+    def _merge(profile: _ToolProfile, profiler) -> None:
+        import pstats
+        if profile.stats is None:
+            profile.stats = pstats.Stats(profiler)
+        else:
+            profile.stats.add(profiler)
+
+    def report(self, tool_name: str, limit: int = 25) -> Dict[str, Any] | None:
+        """Summarise ``tool_name``'s profile, or ``None`` if it was never enabled."""
+        import io
+        import pstats
+        with self._lock:
+            profile = self._profiles.get(tool_name)
+            if profile is None:
+                return None
+            text = ""
+            if profile.stats is not None:
+                out = io.StringIO()
+                stats = pstats.Stats(stream=out).add(profile.stats)
+                stats.sort_stats("cumulative").print_stats(limit)
+                text = out.getvalue()
+            return {
+                "tool_name": tool_name,
+                "enabled": tool_name in self._active,
+                "sample_rate": profile.sample_rate,
+                "calls": profile.calls,
+                "sampled": profile.sampled,
+                "mean_ms": round(profile.total_ms / profile.calls, 3) if profile.calls else None,
+                "slowest": [entry for _d, _s, entry in sorted(profile.slowest, reverse=True)],
+                "profile": text,
+            }
+
+    def dump(self, tool_name: str) -> bytes | None:
+        """Return the aggregated profile in ``pstats`` dump format, if any."""
+        import marshal
+        with self._lock:
+            profile = self._profiles.get(tool_name)
+            if profile is None or profile.stats is None:
+                return None
+            return marshal.dumps(profile.stats.stats)
+
+    def status(self) -> Dict[str, float]:
+        """Map of enabled tools to their sample rates."""
+        with self._lock:
+            return dict(self._active)
@@ -1,31 +1,31 @@
 """
 Helpers for writing and loading collected tool modules.
 
-This module hides filesystem operations and module loading behind function
+This module hides storage operations and module loading behind function
 calls that defer imports to respect the style preference that imports live
-inside functions.
+inside functions.  Every helper accepts either a directory path (the
+historical on-disk layout) or a :class:`app.storage.RegistryStore`.
 """
 
 from __future__ import annotations
 from typing import List, Tuple, Any, Dict
 
-def _get_tool_name_from_source(path: str) -> str | None:
-    """Read a module file and parse it to find the tool name."""
+def _get_tool_name(text: str) -> str | None:
+    """Parse generated module source to find the tool name."""
     import re
-    with open(path, "r", encoding="utf-8") as f:
-        content = f.read()
-        # Find: _decorator = mcp.tool(name="...", description="...")
-        match = re.search(r"mcp\.tool\s*\(\s*name=\"([^\"]+)\"", content)
-        if match:
-            return match.group(1)
+    # Find: _decorator = mcp.tool(name="...", description="...")
+    match = re.search(r"mcp\.tool\s*\(\s*name=\"([^\"]+)\"", text)
+    if match:
+        return match.group(1)
     return None
 
-def ensure_dirs(base_dir: str) -> str:
-    """Ensure ``base_dir`` exists, creating it if necessary, and return it."""
-    def _impl() -> str:
-        import os
-        os.makedirs(base_dir, exist_ok=True)
-        return base_dir
+def as_store(base):
+    """Return ``base`` as a registry store, wrapping directory paths."""
+    def _impl():
+        from .storage import RegistryStore, FileRegistryStore
+        if isinstance(base, RegistryStore):
+            return base
+        return FileRegistryStore(base)
     return _impl()
 
 def safe_mod_name(name: str) -> str:
@@ -40,40 +40,55 @@ def safe_mod_name(name: str) -> str:
         return s.lower()
     return _impl()
 
-def write_tool_module(
-    base_dir: str,
-    module_name: str,
+def render_tool_module(
     code_blob: str,
     func_name: str,
     tool_name: str,
     description: str,
     arg_spec: List[Tuple[str, str]],
     example_params: Dict[str, Any] | None = None,
-) -> str:
+) -> Tuple[str, Dict[str, Any]]:
     """
-    Persist a generated module that wraps a function from ``code_blob`` as an MCP tool.
+    Generate the source and metadata of a module wrapping a function from ``code_blob``.
+
+    ``arg_spec`` holds the snippet's ``(name, annotation)`` pairs.  They are
+    stored in the metadata with the derived input schema for argument
+    validation.  The wrapper declares them too, except for annotations its
+    module cannot resolve (see :func:`app.validation.wrapper_annotation`).
     """
-    def _impl() -> str:
-        import os
+    def _impl() -> Tuple[str, Dict[str, Any]]:
         import json
-        ensure_dirs(base_dir)
-        args_decl = ", ".join([f"{n}: {t}" for (n, t) in arg_spec]) or ""
+        from .validation import input_schema, wrapper_annotation
+        args_decl = ", ".join([f"{n}: {wrapper_annotation(t)}" for (n, t) in arg_spec]) or ""
         kwargs_pass = ", ".join([f"{n}={n}" for (n, _t) in arg_spec]) or ""
+        kwargs_dict = "{" + ", ".join([f"{json.dumps(n)}: {n}" for (n, _t) in arg_spec]) + "}"
         file_text = f'''# AUTO-GENERATED BY MCPForge. Do not edit by hand.
-from typing import Any
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Union
+
+SOURCE = {json.dumps(code_blob)}
+FUNC_NAME = "{func_name}"
+
+def resolve():
+    """Execute the snippet in a fresh namespace and return its target function."""
+    # All imports inside function, per style preference.
+    import types
+    # One dict serves as globals and locals so module-level imports in the
+    # snippet are visible to its functions.
+    ns = {{}}
+    exec(SOURCE, ns)
+    if FUNC_NAME not in ns or not isinstance(ns.get(FUNC_NAME), types.FunctionType):
+        raise ValueError("Expected function '{func_name}' not found in snippet.")
+    return ns[FUNC_NAME]
 
 def register(mcp):
     """Register tool '{tool_name}' from collected code snippet."""
     def _wrapper({args_decl}) -> Any:
-        # All imports inside function, per style preference.
-        import types
-        ns = {{}}
-        src = {json.dumps(code_blob)}
-        # Execute snippet in isolated namespace
-        exec(src, {{}}, ns)
-        if "{func_name}" not in ns or not isinstance(ns.get("{func_name}"), types.FunctionType):
-            raise ValueError("Expected function '{func_name}' not found in snippet.")
-        target = ns["{func_name}"]
+        runner = getattr(mcp, "snippet_runner", None)
+        if runner is not None:
+            # Fork-server mode: run in a preloaded worker process
+            return str(runner.call(SOURCE, FUNC_NAME, {kwargs_dict}))
+        # Each call gets an isolated namespace
+        target = resolve()
         result = target({kwargs_pass})
         return str(result)
 
@@ -82,88 +97,175 @@ def register(mcp):
     registered = _decorator(_wrapper)
     return registered
 '''
-        path = os.path.join(base_dir, f"{module_name}.py")
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(file_text)
         # Persist example parameters alongside the module for later testing
-        meta_path = os.path.join(base_dir, f"{module_name}.json")
-        with open(meta_path, "w", encoding="utf-8") as mf:
-            import json
-            json.dump({"tool_name": tool_name, "example_params": example_params or {}}, mf)
-        return path
+        types = [list(pair) for pair in arg_spec]
+        meta = {
+            "tool_name": tool_name,
+            "example_params": example_params or {},
+            "arg_spec": types,
+            "input_schema": input_schema(types),
+        }
+        return file_text, meta
+    return _impl()
+
+def write_tool_module(
+    base_dir,
+    module_name: str,
+    code_blob: str,
+    func_name: str,
+    tool_name: str,
+    description: str,
+    arg_spec: List[Tuple[str, str]],
+    example_params: Dict[str, Any] | None = None,
+) -> str:
+    """
+    Persist a generated module that wraps a function from ``code_blob`` as an MCP tool.
+
+    ``base_dir`` may be a directory path or a registry store; the remaining
+    arguments are those of :func:`render_tool_module`.  Returns the address of
+    the stored module (a file path for on-disk stores).
+    """
+    def _impl() -> str:
+        file_text, meta = render_tool_module(
+            code_blob, func_name, tool_name, description, arg_spec, example_params
+        )
+        return as_store(base_dir).write(module_name, file_text, meta)
     return _impl()
 
-def load_all_registered(mcp, base_dir: str) -> Dict[str, str]:
+class _Staging:
+    """Stand-in for ``mcp`` that captures tools instead of registering them."""
+
+    def __init__(self, mcp) -> None:
+        self._mcp = mcp
+        self.tools: List[Any] = []
+
+    def tool(self, name: str | None = None, description: str | None = None, **kwargs: Any):
+        from fastmcp.tools import FunctionTool
+
+        def _decorator(fn):
+            tool = FunctionTool.from_function(fn, name=name, description=description, **kwargs)
+            self.tools.append(tool)
+            return tool
+        return _decorator
+
+    def __getattr__(self, attr: str) -> Any:
+        # Wrappers look up e.g. ``snippet_runner`` at call time.
+        return getattr(self._mcp, attr)
+
+def build_tool(
+    mcp,
+    module_name: str,
+    text: str,
+    meta: Dict[str, Any] | None,
+    address: str | None = None,
+    code: Any = None,
+):
+    """
+    Compile generated module ``text`` without registering anything.
+
+    ``code`` may carry an already compiled code object for ``text`` (e.g.
+    from a registry snapshot) to skip compilation.
+
+    Returns ``(tool_name, module, tool)`` where ``tool`` is the FastMCP tool the
+    module would register (with its precompiled validator when ``meta`` has an
+    ``arg_spec``, and wired to ``mcp.profiler`` when there is one), or ``None``
+    if ``text`` is not a generated tool module.
+    """
+    def _impl():
+        import types
+        tool_name = _get_tool_name(text)
+        if not tool_name:
+            return None
+        mod = types.ModuleType(module_name)
+        mod.__file__ = address or f"<{module_name}>"
+        exec(code or compile(text, mod.__file__, "exec"), mod.__dict__)
+        if not hasattr(mod, "register"):
+            return None
+        staging = _Staging(mcp)
+        mod.register(staging)
+        if not staging.tools:
+            return None
+        tool = staging.tools[-1]
+        profiler = getattr(mcp, "profiler", None)
+        if meta and "arg_spec" in meta:
+            # Precompiled validator and accurate input schema
+            from .validation import validated_copy
+            tool = validated_copy(tool, meta["arg_spec"], meta.get("input_schema"), profiler)
+        elif profiler is not None:
+            # Older modules keep pydantic validation but can still be profiled
+            from .validation import profiled_copy
+            tool = profiled_copy(tool, profiler)
+        return tool_name, mod, tool
+    return _impl()
+
+def swap_tool(mcp, tool_name: str, mod, tool) -> None:
     """
-    Import every module in ``base_dir`` and call its ``register(mcp)`` function.
+    Make ``tool`` the live implementation of ``tool_name``.
+
+    Registration replaces a single dictionary entry, so new calls see the new
+    version at once while calls already running finish on the old one.
+    """
+    mcp.add_tool(tool)
+    # Keep the module so callers can reach ``resolve`` (e.g. batch calls).
+    modules = getattr(mcp, "tool_modules", None)
+    if isinstance(modules, dict):
+        modules[tool_name] = mod
+
+def load_module(mcp, base_dir, module_name: str) -> str | None:
+    """
+    Compile a single stored module and register the tool it defines.
+
+    Returns the registered tool name, or ``None`` if the module is missing or
+    does not look like a generated tool module.
+    """
+    def _impl() -> str | None:
+        store = as_store(base_dir)
+        text = store.read_source(module_name)
+        if text is None:
+            return None
+        built = build_tool(mcp, module_name, text, store.read_meta(module_name), store.address(module_name))
+        if built is None:
+            return None
+        tool_name, mod, tool = built
+        swap_tool(mcp, tool_name, mod, tool)
+        return tool_name
+    return _impl()
+
+def load_all_registered(mcp, base_dir) -> Dict[str, str]:
+    """
+    Load every module in ``base_dir`` and call its ``register(mcp)`` function.
     Returns a map from module names to registered tool names.
     """
     def _impl() -> Dict[str, str]:
-        import os
-        import importlib.util
-        import sys
+        store = as_store(base_dir)
         loaded: Dict[str, str] = {}
-        if not os.path.isdir(base_dir):
-            return loaded
-        if base_dir not in sys.path:
-            sys.path.insert(0, base_dir)
-        for fn in sorted(os.listdir(base_dir)):
-            if not fn.endswith(".py"):
-                continue
-            path = os.path.join(base_dir, fn)
-            name = os.path.splitext(fn)[0]
-            tool_name = _get_tool_name_from_source(path)
-            if not tool_name:
-                continue
-            spec = importlib.util.spec_from_file_location(name, path)
-            mod = importlib.util.module_from_spec(spec)
-            assert spec and spec.loader
-            spec.loader.exec_module(mod)  # type: ignore[assignment]
-            if hasattr(mod, "register"):
-                mod.register(mcp)
+        for name in store.modules():
+            tool_name = load_module(mcp, store, name)
+            if tool_name:
                 loaded[name] = tool_name
         return loaded
     return _impl()
 
-def delete_tool_module(base_dir: str, module_name: str) -> bool:
+def delete_tool_module(base_dir, module_name: str) -> bool:
     """
     Remove a generated tool module by name.
 
-    Returns ``True`` if the file was removed, ``False`` if it did not exist.
+    Returns ``True`` if the module was removed, ``False`` if it did not exist.
     """
     def _impl() -> bool:
-        import os
-        path = os.path.join(base_dir, f"{module_name}.py")
-        meta_path = os.path.join(base_dir, f"{module_name}.json")
-        removed = False
-        if os.path.exists(path):
-            os.remove(path)
-            removed = True
-        if os.path.exists(meta_path):
-            os.remove(meta_path)
-            removed = True
-        return removed
+        return as_store(base_dir).delete(module_name)
     return _impl()
 
 
-def load_example_params(base_dir: str) -> Dict[str, Dict[str, Any]]:
+def load_example_params(base_dir) -> Dict[str, Dict[str, Any]]:
     """Load stored example parameters for each module in ``base_dir``."""
     def _impl() -> Dict[str, Dict[str, Any]]:
-        import os
-        import json
+        store = as_store(base_dir)
         data: Dict[str, Dict[str, Any]] = {}
-        if not os.path.isdir(base_dir):
-            return data
-        for fn in os.listdir(base_dir):
-            if fn.endswith('.json'):
-                path = os.path.join(base_dir, fn)
-                try:
-                    with open(path, 'r', encoding='utf-8') as f:
-                        meta = json.load(f)
-                    module = os.path.splitext(fn)[0]
-                    params = meta.get('example_params', {})
-                    data[module] = params
-                except (json.JSONDecodeError, IOError):
-                    continue
+        for module in store.modules():
+            meta = store.read_meta(module)
+            if meta is None:
+                continue
+            data[module] = meta.get('example_params', {})
         return data
     return _impl()
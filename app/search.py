@@ -0,0 +1,125 @@
+"""
+Full-text search over collected tools.
+
+:class:`SearchIndex` is an in-memory inverted index scored with BM25.  Each
+collected module is one document built from the tool name, argument names,
+description and the snippet function's docstring.  Name and argument tokens
+count more than prose, by repeating their term frequencies.  Identifiers are
+split on underscores and camelCase, so ``parse_iso_date`` matches ``date``.
+The index is updated one document at a time as tools are ingested, updated
+and removed, so queries never rescan the registry.
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List
+
+# Term-frequency weight per field (a cheap BM25F).
+FIELD_WEIGHTS = {"name": 3, "args": 2, "description": 1, "doc": 1}
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens of ``text``, with identifiers split into parts."""
+    def _impl() -> List[str]:
+        import re
+        spaced = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", text or "")
+        return re.findall(r"[a-z0-9]+", spaced.lower())
+    return _impl()
+
+
+class SearchIndex:
+    """Incrementally maintained BM25 index keyed by module name."""
+
+    def __init__(self) -> None:
+        import threading
+        self._lock = threading.Lock()
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(
+        self,
+        module_name: str,
+        tool_name: str,
+        description: str = "",
+        doc: str = "",
+        args: Iterable[str] = (),
+    ) -> None:
+        """Index (or re-index) one collected tool."""
+        import collections
+        fields = {"name": tool_name, "args": " ".join(args), "description": description, "doc": doc}
+        tf: Dict[str, int] = collections.Counter()
+        for field, text in fields.items():
+            for token in tokenize(text):
+                tf[token] += FIELD_WEIGHTS[field]
+        with self._lock:
+            self._remove(module_name)
+            length = sum(tf.values())
+            self._docs[module_name] = {
+                "tool_name": tool_name,
+                "description": description,
+                "length": length,
+                "terms": list(tf),
+            }
+            self._total_length += length
+            for token, count in tf.items():
+                self._postings.setdefault(token, {})[module_name] = count
+
+    def remove(self, module_name: str) -> bool:
+        """Drop a module from the index; return ``True`` if it was indexed."""
+        with self._lock:
+            return self._remove(module_name)
+
+    def _remove(self, module_name: str) -> bool:
+        doc = self._docs.pop(module_name, None)
+        if doc is None:
+            return False
+        self._total_length -= doc["length"]
+        for token in doc["terms"]:
+            posting = self._postings.get(token)
+            if posting is not None:
+                posting.pop(module_name, None)
+                if not posting:
+                    del self._postings[token]
+        return True
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Return the ``limit`` best matches for ``query``, best first.
+
+        Query terms with no exact match fall back to indexed terms that start
+        with them (e.g. ``mult`` finds ``multiply``).
+        """
+        import heapq
+        import math
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            n = len(self._docs)
+            if not n or not terms or limit <= 0:
+                return []
+            avg_length = self._total_length / n or 1.0
+            scores: Dict[str, float] = {}
+            for term in terms:
+                expanded = [term] if term in self._postings else (
+                    [t for t in self._postings if t.startswith(term)] if len(term) >= 3 else []
+                )
+                for token in expanded:
+                    posting = self._postings[token]
+                    idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+                    for module_name, tf in posting.items():
+                        norm = K1 * (1 - B + B * self._docs[module_name]["length"] / avg_length)
+                        scores[module_name] = scores.get(module_name, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+            best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+            return [
+                {
+                    "module": module_name,
+                    "tool_name": self._docs[module_name]["tool_name"],
+                    "description": self._docs[module_name]["description"],
+                    "score": round(score, 4),
+                }
+                for module_name, score in best
+            ]
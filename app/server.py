@@ -14,13 +14,11 @@ It also exposes a ``forge_health`` tool to check the server health.
 
 from __future__ import annotations
 from typing import List, Tuple, Dict, Any
-from .llm import choose_tools_with_gpt, rewrite_snippet_with_gpt
 
 def _parse_functions(code: str) -> List[Dict[str, Any]]:
     """Parse top-level functions in a Python snippet to extract signatures."""
     def _impl() -> List[Dict[str, Any]]:
         import ast
-        import inspect
         import textwrap
 
         try:
@@ -34,27 +32,11 @@ def _parse_functions(code: str) -> List[Dict[str, Any]]:
             if isinstance(node, ast.FunctionDef):
                 name = node.name
                 doc = ast.get_docstring(node) or ""
-                args: List[Tuple[str, str]] = []
-                for a in node.args.args:
-                    ann = "Any"
-                    if a.annotation is not None:
-                        if isinstance(a.annotation, ast.Name):
-                            ann = a.annotation.id
-                        else:
-                            try:
-                                ann = inspect.getsource(ast.fix_missing_locations(a.annotation))
-                            except Exception:
-                                ann = "Any"
-                    args.append((a.arg, ann))
-                ret = "Any"
-                if node.returns is not None:
-                    if isinstance(node.returns, ast.Name):
-                        ret = node.returns.id
-                    else:
-                        try:
-                            ret = inspect.getsource(ast.fix_missing_locations(node.returns))
-                        except Exception:
-                            ret = "Any"
+                args = [
+                    (a.arg, ast.unparse(a.annotation) if a.annotation is not None else "Any")
+                    for a in node.args.args
+                ]
+                ret = ast.unparse(node.returns) if node.returns is not None else "Any"
                 out.append({"name": name, "doc": doc, "args": args, "returns": ret})
         return out
     return _impl()
@@ -68,6 +50,8 @@ def _prepare_snippet(text: str) -> str:
         import ast
         import textwrap
 
+        from .llm import rewrite_snippet_with_gpt
+
         # First try to extract fenced code blocks `````python ... `````".
         fence = re.search(r"```(?:python)?\n([\s\S]*?)```", text)
         candidate = fence.group(1) if fence else text
@@ -98,23 +82,96 @@ def _prepare_snippet(text: str) -> str:
 
     return _impl()
 
-def build_server():
-    """Construct and return the FastMCP server configured with admin tools."""
+def build_server(
+    registry_dir: str | None = None,
+    registry_backend: str | None = None,
+    snapshot: str | None = None,
+):
+    """
+    Construct and return the FastMCP server configured with admin tools.
+
+    ``registry_dir`` and ``registry_backend`` select where collected modules
+    are stored (see :func:`app.storage.open_store`); when omitted they fall
+    back to ``MCPFORGE_REGISTRY_DIR`` / ``MCPFORGE_REGISTRY_BACKEND`` and then
+    to a file store in ``./registry``.  ``snapshot`` names a registry
+    snapshot file (see :mod:`app.snapshot`) to import at startup.
+    """
     def _impl():
         from fastmcp import FastMCP
+        from .storage import open_store
+        from .admission import AdmissionController, AdmissionError, admission_middleware, current_client
+        from .audit import AuditLog, audit_middleware
+        from .jobs import PENDING, JobQueue
+        from .batch import batch_limits, run_batch
+        from .curation import curate_locally, curation_mode
+        from .singleflight import SingleFlight, content_key
+        from .execution import execution_mode
+        from .search import SearchIndex
+        from .profiling import ToolProfiler
+        import threading
+        import os
         from .registry import (
-            ensure_dirs,
             load_all_registered,
             write_tool_module,
             safe_mod_name,
             delete_tool_module,
             load_example_params,
+            render_tool_module,
+            build_tool,
+            swap_tool,
         )
 
-        REG_DIR = ensure_dirs("./registry")
-        mcp = FastMCP("MCPForge (single port)")
+        REG = open_store(registry_backend, registry_dir)
+        # Re-registering a tool name replaces it (reloads and in-place updates)
+        mcp = FastMCP("MCPForge (single port)", on_duplicate_tools="replace")
+        admission = AdmissionController.from_env()
+        # Audit first, so calls rejected by admission control are recorded too
+        audit = AuditLog.from_env()
+        mcp.add_middleware(audit_middleware(audit))
+        mcp.add_middleware(admission_middleware(admission))
+        jobs = JobQueue(
+            workers=int(os.getenv("MCPFORGE_JOB_WORKERS") or admission.ingest_gate.concurrency),
+        )
+        # Coalesce identical concurrent ingests (sync calls and queued jobs).
+        flights = SingleFlight()
+        inflight_jobs: Dict[str, str] = {}
+        jobs_lock = threading.Lock()
         module_tool_map: Dict[str, str] = {}
         module_params_map: Dict[str, Dict[str, Any]] = {}
+        # Generated modules by tool name, filled in by ``load_module``
+        mcp.tool_modules = {}  # type: ignore[attr-defined]
+        # Out-of-process executor consulted by generated tool wrappers
+        mcp.snippet_runner = None  # type: ignore[attr-defined]
+        if execution_mode() == "forkserver":
+            from .execution import ForkServerRunner
+            mcp.snippet_runner = ForkServerRunner()
+        # Per-tool profiling, off until enabled through ``collector.profile``
+        mcp.profiler = ToolProfiler()  # type: ignore[attr-defined]
+
+        def _sync_runner() -> None:
+            """Hand the current snippet sources to the fork server, if enabled."""
+            if mcp.snippet_runner is not None:
+                mcp.snippet_runner.load(
+                    [m.SOURCE for m in mcp.tool_modules.values() if hasattr(m, "SOURCE")]
+                )
+
+        # Full-text index over collected tools, kept in step with the registry
+        search_index = SearchIndex()
+
+        def _index_module(module_name: str) -> None:
+            """(Re)index one loaded module from its tool, snippet and metadata."""
+            tool_name = module_tool_map.get(module_name)
+            tool = mcp._tool_manager._tools.get(tool_name) if tool_name else None
+            if tool is None:
+                return
+            mod = mcp.tool_modules.get(tool_name)
+            func = next(
+                (f for f in _parse_functions(getattr(mod, "SOURCE", "")) if f["name"] == getattr(mod, "FUNC_NAME", None)),
+                {"doc": "", "args": []},
+            )
+            search_index.add(
+                module_name, tool_name, tool.description or "", func["doc"], [a for a, _t in func["args"]]
+            )
 
         @mcp.tool(name="collector.list", description="List collected tool modules currently registered.")
         def list_collected() -> List[str]:
@@ -130,26 +187,90 @@ def build_server():
                     # It may have already been removed, or not exist.
                     pass
             # Now remove the module file
-            ok = delete_tool_module(REG_DIR, module_name)
+            ok = delete_tool_module(REG, module_name)
             if ok and module_name in module_tool_map:
+                mcp.tool_modules.pop(module_tool_map[module_name], None)
                 del module_tool_map[module_name]
             if ok and module_name in module_params_map:
                 del module_params_map[module_name]
+            search_index.remove(module_name)
+            if ok:
+                _sync_runner()
+                if tool_name:
+                    mcp.profiler.clear(tool_name)
             return ok
 
-        @mcp.tool(name="collector.ingest_python", description="Ingest a Python snippet and expose chosen functions as tools.")
-        def ingest_python(snippet_name: str, code: str) -> Dict[str, Any]:
+        def ingest_snippet(
+            snippet_name: str, code: str, source: str = "sync", caller: str | None = None
+        ) -> Dict[str, Any]:
+            """
+            Run the ingest pipeline once an ingest slot is free (blocking).
+
+            Concurrent calls with the same snippet name and code share a single
+            pipeline run; followers get ``"shared": True`` in their result.
+            ``source`` and ``caller`` label the audit record; the caller
+            defaults to the current MCP client.
+            """
+            def _gated() -> Dict[str, Any]:
+                with admission.ingest_gate.admit():
+                    return _ingest(snippet_name, code)
+
+            def _run() -> Dict[str, Any]:
+                result, shared = flights.do(content_key("ingest", snippet_name, code), _gated)
+                return dict(result, shared=True) if shared else result
+
+            return _audited_ingest(snippet_name, code, source, _run, caller)
+
+        def _audited_ingest(
+            snippet_name: str, code: str, source: str, run, caller: str | None = None
+        ) -> Dict[str, Any]:
+            """Call ``run()`` and queue an ``ingest`` audit record for it."""
+            import time
+            caller = caller or current_client()
+            started = time.perf_counter()
+            try:
+                result = run()
+            except Exception as exc:
+                audit.record(
+                    "ingest", snippet_name, caller, (time.perf_counter() - started) * 1000,
+                    len(code), 0, "error", f"{type(exc).__name__}: {exc}"[:500], source,
+                )
+                raise
+            audit.record(
+                "ingest", snippet_name, caller, (time.perf_counter() - started) * 1000,
+                len(code), len(result.get("created") or ()), "ok" if result.get("created") else "empty",
+                source=source,
+            )
+            return result
+
+        def _ingest(snippet_name: str, code: str) -> Dict[str, Any]:
+            from .llm import choose_tools_with_gpt
             code = _prepare_snippet(code)
             funcs = _parse_functions(code)
             if not funcs:
                 return {"created": [], "reason": "no functions found"}
-            summaries = [{"name": f["name"], "doc": f["doc"], "args": f["args"]} for f in funcs]
-            try:
-                chosen = choose_tools_with_gpt(code, summaries)
-            except Exception:
-                chosen = []
+            mode = curation_mode()
+            chosen, verdicts = curate_locally(code, funcs) if mode != "llm" else (None, {})
+            path = "local"
+            if chosen is None and mode != "local":
+                path = "llm"
+                summaries = [{"name": f["name"], "doc": f["doc"], "args": f["args"]} for f in funcs]
+                try:
+                    chosen = choose_tools_with_gpt(code, summaries)
+                except Exception:
+                    chosen = []
+            curation = {"path": path, "functions": verdicts}
+            if path == "local" and chosen is not None and not chosen:
+                return {"created": [], "reason": "no safe functions", "curation": curation}
+            # Whatever picked them, functions the local analysis found unsafe
+            # are never registered.
+            unsafe = {name for name, v in verdicts.items() if v["verdict"] == "unsafe"}
+            chosen = [c for c in chosen or () if c.get("original_name") not in unsafe]
             if not chosen:
-                f0 = funcs[0]
+                curation["path"] = "fallback"
+                f0 = next((f for f in funcs if f["name"] not in unsafe), None)
+                if f0 is None:
+                    return {"created": [], "reason": "no safe functions", "curation": curation}
                 example = {arg[0]: i + 1 for i, arg in enumerate(f0["args"])}
                 chosen = [{
                     "original_name": f0["name"],
@@ -170,33 +291,369 @@ def build_server():
                     continue
                 arg_spec = func_info["args"]
                 mod_name = f"{base}_{idx}"
-                write_tool_module("./registry", mod_name, code, orig, tname, desc, arg_spec, params)
+                write_tool_module(
+                    REG, mod_name, code, orig, tname, desc, arg_spec, params
+                )
                 created.append(mod_name)
                 module_params_map[mod_name] = params
                 idx += 1
-            new_map = load_all_registered(mcp, "./registry")
+            new_map = load_all_registered(mcp, REG)
             module_tool_map.update(new_map)
-            module_params_map.update(load_example_params("./registry"))
-            return {"created": created}
+            module_params_map.update(load_example_params(REG))
+            _sync_runner()
+            for mod_name in created:
+                _index_module(mod_name)
+            return {"created": created, "curation": curation}
+
+        @mcp.tool(name="collector.ingest_python", description="Ingest a Python snippet and expose chosen functions as tools.")
+        async def ingest_python(snippet_name: str, code: str) -> Dict[str, Any]:
+            import anyio
+            from fastmcp.exceptions import ToolError
+            # Run the pipeline off the event loop so other requests keep flowing.
+            try:
+                return await anyio.to_thread.run_sync(ingest_snippet, snippet_name, code)
+            except AdmissionError as exc:
+                raise ToolError(str(exc)) from exc
+
+        def submit_ingest(snippet_name: str, code: str, caller: str | None = None) -> str:
+            """
+            Queue an ingest as a background job and return its job ID.
+
+            An identical ingest that is still queued or running is reused, so
+            every submitter polls the same job.
+            """
+            key = content_key("ingest", snippet_name, code)
+            caller = caller or current_client()
+            with jobs_lock:
+                existing = inflight_jobs.get(key)
+                job = jobs.get(existing) if existing else None
+                if job and job["status"] in PENDING:
+                    return existing
+                # Count the job as pending now so a full queue is rejected up
+                # front.  The slot itself is only taken by the flight leader, in
+                # the same order as ``ingest_snippet``: a follower never holds a
+                # slot while it waits for the leader.
+                ticket = admission.ingest_gate.reserve()
+
+                def _slotted() -> Dict[str, Any]:
+                    with admission.ingest_gate.slot():
+                        return _ingest(snippet_name, code)
+
+                def _run() -> Dict[str, Any]:
+                    try:
+                        with ticket:
+                            return _audited_ingest(
+                                snippet_name, code, "job", lambda: flights.do(key, _slotted)[0], caller
+                            )
+                    finally:
+                        with jobs_lock:
+                            if inflight_jobs.get(key) == job_id:
+                                del inflight_jobs[key]
+
+                job_id = jobs.submit("ingest", _run, snippet_name=snippet_name)
+                inflight_jobs[key] = job_id
+                return job_id
+
+        @mcp.tool(
+            name="collector.ingest_python_async",
+            description="Queue a Python snippet for background ingestion and return a job ID to poll.",
+        )
+        def ingest_python_async(snippet_name: str, code: str) -> Dict[str, Any]:
+            from fastmcp.exceptions import ToolError
+            try:
+                job_id = submit_ingest(snippet_name, code)
+            except AdmissionError as exc:
+                raise ToolError(str(exc)) from exc
+            return {"job_id": job_id, "status": "queued"}
+
+        @mcp.tool(name="collector.job_status", description="Report the status and result of a background job.")
+        def job_status(job_id: str) -> Dict[str, Any]:
+            from fastmcp.exceptions import ToolError
+            job = jobs.get(job_id)
+            if job is None:
+                raise ToolError(f"Unknown job: {job_id}")
+            return job
+
+        # Serialises in-place updates and rollbacks of collected tools
+        update_lock = threading.Lock()
+        history = int(os.getenv("MCPFORGE_TOOL_HISTORY") or 3)
+
+        def _module_for(tool_name: str) -> str:
+            module_name = next((m for m, t in module_tool_map.items() if t == tool_name), None)
+            if module_name is None:
+                raise LookupError(f"Unknown collected tool: {tool_name}")
+            return module_name
+
+        def _install(module_name: str, text: str, meta: Dict[str, Any]) -> None:
+            """Compile a module version off to the side, persist it and swap it in."""
+            built = build_tool(mcp, module_name, text, meta, REG.address(module_name))
+            if built is None:
+                raise ValueError(f"{module_name} does not define a collected tool")
+            tool_name, mod, tool = built
+            REG.write(module_name, text, meta)
+            swap_tool(mcp, tool_name, mod, tool)
+            module_params_map[module_name] = meta.get("example_params", {})
+            _sync_runner()
+            _index_module(module_name)
+
+        def update_tool(
+            tool_name: str,
+            code: str,
+            function_name: str | None = None,
+            description: str | None = None,
+        ) -> Dict[str, Any]:
+            """
+            Replace the function behind ``tool_name`` without unregistering it.
+
+            The new version keeps the tool and module names.  It is compiled and
+            validated before the swap; calls already running finish on the old
+            version.  Up to ``MCPFORGE_TOOL_HISTORY`` previous versions are kept
+            in the module metadata for :func:`rollback_tool`.
+            """
+            from .curation import analyze_snippet
+            module_name = _module_for(tool_name)
+            with admission.ingest_gate.admit():
+                code = _prepare_snippet(code)
+                funcs = {f["name"]: f for f in _parse_functions(code)}
+                current = getattr(mcp.tool_modules.get(tool_name), "FUNC_NAME", None)
+                func_name = function_name or current
+                if func_name not in funcs and function_name is None and len(funcs) == 1:
+                    func_name = next(iter(funcs))
+                if func_name not in funcs:
+                    raise ValueError(f"function '{func_name}' not found in snippet")
+                func = funcs[func_name]
+                analysis = analyze_snippet(code).get(func_name, {})
+                if analysis.get("verdict") == "unsafe":
+                    raise ValueError(f"function '{func_name}' is unsafe: " + "; ".join(analysis["reasons"]))
+                with update_lock:
+                    old_text = REG.read_source(module_name)
+                    old_meta = REG.read_meta(module_name) or {}
+                    previous = old_meta.pop("previous", [])
+                    names = [a for a, _t in func["args"]]
+                    examples = analysis.get("examples") or {}
+                    if set(examples) != set(names):
+                        examples = {k: v for k, v in old_meta.get("example_params", {}).items() if k in names}
+                    text, meta = render_tool_module(
+                        code,
+                        func_name,
+                        tool_name,
+                        description or mcp._tool_manager._tools[tool_name].description or "",
+                        func["args"],
+                        examples,
+                    )
+                    meta["version"] = old_meta.get("version", 1) + 1
+                    meta["previous"] = ([{"source": old_text, "meta": old_meta}] + previous)[:history]
+                    _install(module_name, text, meta)
+            return {
+                "tool_name": tool_name,
+                "module": module_name,
+                "version": meta["version"],
+                "previous_versions": len(meta["previous"]),
+            }
+
+        def rollback_tool(tool_name: str) -> Dict[str, Any]:
+            """Restore the previous version of ``tool_name`` without re-curating it."""
+            module_name = _module_for(tool_name)
+            with update_lock:
+                previous = (REG.read_meta(module_name) or {}).get("previous") or []
+                if not previous:
+                    raise ValueError(f"no previous version of {tool_name}")
+                restored = dict(previous[0]["meta"], previous=previous[1:])
+                _install(module_name, previous[0]["source"], restored)
+            return {
+                "tool_name": tool_name,
+                "module": module_name,
+                "version": restored.get("version", 1),
+                "previous_versions": len(restored["previous"]),
+            }
+
+        @mcp.tool(
+            name="collector.update",
+            description="Replace the code behind a collected tool in place; the tool stays available throughout.",
+        )
+        async def update_tool_mcp(
+            tool_name: str,
+            code: str,
+            function_name: str | None = None,
+            description: str | None = None,
+        ) -> Dict[str, Any]:
+            import anyio
+            from fastmcp.exceptions import ToolError
+            try:
+                return await anyio.to_thread.run_sync(update_tool, tool_name, code, function_name, description)
+            except (AdmissionError, LookupError, ValueError) as exc:
+                raise ToolError(str(exc)) from exc
+
+        @mcp.tool(name="collector.rollback", description="Restore the previous version of an updated collected tool.")
+        async def rollback_tool_mcp(tool_name: str) -> Dict[str, Any]:
+            import anyio
+            from fastmcp.exceptions import ToolError
+            try:
+                return await anyio.to_thread.run_sync(rollback_tool, tool_name)
+            except (LookupError, ValueError) as exc:
+                raise ToolError(str(exc)) from exc
+
+        def import_snapshot(blob: bytes) -> Dict[str, Any]:
+            """
+            Bulk-register every module in a snapshot archive.
+
+            All modules are compiled first (reusing shipped bytecode when the
+            interpreter matches), then written in one batch and registered in
+            one pass.  Same-named modules are replaced.
+            """
+            from .snapshot import read_snapshot
+            entries = read_snapshot(blob)
+            built = []
+            skipped: List[str] = []
+            for entry in entries:
+                result = build_tool(
+                    mcp, entry["name"], entry["source"], entry["meta"], REG.address(entry["name"]), entry["code"]
+                )
+                if result is None:
+                    skipped.append(entry["name"])
+                else:
+                    built.append((entry, result))
+            with update_lock:
+                REG.write_many([(e["name"], e["source"], e["meta"]) for e, _r in built])
+                for entry, (tool_name, mod, tool) in built:
+                    swap_tool(mcp, tool_name, mod, tool)
+                    module_tool_map[entry["name"]] = tool_name
+                    module_params_map[entry["name"]] = entry["meta"].get("example_params", {})
+                    _index_module(entry["name"])
+                _sync_runner()
+            return {
+                "imported": [e["name"] for e, _r in built],
+                "skipped": skipped,
+                "bytecode": sum(1 for e, _r in built if e["code"] is not None),
+            }
+
+        def export_registry(include_bytecode: bool = True) -> bytes:
+            """Return a snapshot archive of the whole registry."""
+            from .snapshot import export_snapshot
+            with update_lock:
+                return export_snapshot(REG, include_bytecode)
+
+        @mcp.tool(
+            name="collector.search",
+            description="Search collected tools by name, description, docstring and argument names; best matches first.",
+        )
+        def search_tools(query: str, limit: int = 10) -> Dict[str, Any]:
+            return {"query": query, "results": search_index.search(query, max(1, min(limit, 100)))}
+
+        @mcp.tool(
+            name="collector.profile",
+            description=(
+                "Turn profiling of a collected tool on or off. While on, calls are timed, the slowest are "
+                "kept, and sample_rate (0-1) of calls run under cProfile."
+            ),
+        )
+        def profile_tool(tool_name: str, enabled: bool = True, sample_rate: float = 0.1, reset: bool = False) -> Dict[str, Any]:
+            from fastmcp.exceptions import ToolError
+            if tool_name not in module_tool_map.values():
+                raise ToolError(f"Unknown collected tool: {tool_name}")
+            if enabled:
+                mcp.profiler.enable(tool_name, sample_rate, reset)
+            else:
+                mcp.profiler.disable(tool_name)
+            return {"tool_name": tool_name, "enabled": enabled, "profiling": mcp.profiler.status()}
+
+        @mcp.tool(
+            name="collector.profile_report",
+            description="Show a collected tool's profile: call counts, slowest calls and the aggregated cProfile summary.",
+        )
+        def profile_report(tool_name: str, limit: int = 25) -> Dict[str, Any]:
+            from fastmcp.exceptions import ToolError
+            report = mcp.profiler.report(tool_name, max(1, min(limit, 200)))
+            if report is None:
+                raise ToolError(f"No profile for {tool_name}; enable it with collector.profile")
+            return report
+
+        @mcp.tool(
+            name="collector.audit",
+            description="Summarise recent tool calls and ingests from the audit log: counts, errors, latency and payload sizes.",
+        )
+        def audit_report(window_seconds: float = 900) -> Dict[str, Any]:
+            return audit.aggregates(window_seconds)
+
+        def call_batch(tool_name: str, items: List[Any], max_parallel: int = 1) -> Dict[str, Any]:
+            """Run a collected tool over ``items`` using one resolved snippet function."""
+            limits = batch_limits()
+            if tool_name not in module_tool_map.values():
+                raise LookupError(f"Unknown collected tool: {tool_name}")
+            if len(items) > limits["max_items"]:
+                raise ValueError(f"batch too large ({len(items)} items, limit {limits['max_items']})")
+            admission.charge_tool(tool_name, len(items))
+            mod = mcp.tool_modules.get(tool_name)
+            runner = mcp.snippet_runner
+            if runner is not None and hasattr(mod, "SOURCE"):
+
+                def _call(args: Dict[str, Any]) -> Any:
+                    return str(runner.call(mod.SOURCE, mod.FUNC_NAME, args))
+            elif mod is not None and hasattr(mod, "resolve"):
+                target = mod.resolve()
+
+                def _call(args: Dict[str, Any]) -> Any:
+                    return str(target(**args))
+            else:
+                # Modules generated before ``resolve`` existed: call the tool wrapper.
+                tool = mcp._tool_manager._tools[tool_name]
+
+                def _call(args: Dict[str, Any]) -> Any:
+                    return tool.fn(**args)
+            if mcp.profiler.watching(tool_name):
+                run_item = _call
+
+                def _call(args: Dict[str, Any]) -> Any:
+                    return mcp.profiler.observe(tool_name, args, lambda **kw: run_item(kw))
+            validate = getattr(mcp._tool_manager._tools.get(tool_name), "validator", None)
+            if validate is not None:
+                # Reject bad items with the tool's precompiled validator first
+                run_one = _call
+
+                def _call(args: Dict[str, Any]) -> Any:
+                    return run_one(validate(args))
+            parallel = max(1, min(max_parallel, limits["max_parallel"]))
+            results = run_batch(_call, items, parallel)
+            return {
+                "tool_name": tool_name,
+                "results": results,
+                "failed": sum(1 for r in results if not r["ok"]),
+            }
+
+        @mcp.tool(
+            name="collector.call_batch",
+            description="Call one collected tool over a list of argument objects; results are returned in order.",
+        )
+        async def call_batch_tool(tool_name: str, items: List[Any], max_parallel: int = 1) -> Dict[str, Any]:
+            import anyio
+            from fastmcp.exceptions import ToolError
+            try:
+                return await anyio.to_thread.run_sync(call_batch, tool_name, items, max_parallel)
+            except (AdmissionError, LookupError, ValueError) as exc:
+                raise ToolError(str(exc)) from exc
 
         @mcp.tool(name="forge_health", description="Health check for the MCP Forge server.")
         def forge_health() -> str:
             import platform
             import sys
             import os
-            from openai import OpenAI, AuthenticationError
 
             py_ver = sys.version.split()[0]
             os_name = platform.system()
             report = [f"py={py_ver}", f"os={os_name}"]
+            gate = admission.stats()
+            report.append(
+                f"ingest={gate['ingest_pending']}/{gate['ingest_concurrency']}+{gate['ingest_queue']}"
+            )
             # Check for OpenAI API key and connectivity
             api_key = os.getenv("OPENAI_API_KEY")
             if not api_key:
                 report.append("openai=no-key")
             else:
+                from openai import AuthenticationError
+                from .llm import get_client
                 try:
-                    client = OpenAI(api_key=api_key)
-                    client.models.list()
+                    get_client().models.list()
                     report.append("openai=ok")
                 except AuthenticationError:
                     report.append("openai=auth-failed")
@@ -204,46 +661,190 @@ def build_server():
                     report.append("openai=connect-failed")
             return "ok | " + " | ".join(report)
 
-        module_tool_map.update(load_all_registered(mcp, "./registry"))
-        module_params_map.update(load_example_params("./registry"))
+        module_tool_map.update(load_all_registered(mcp, REG))
+        module_params_map.update(load_example_params(REG))
+        _sync_runner()
+        for module_name in module_tool_map:
+            _index_module(module_name)
+        if snapshot:
+            with open(snapshot, "rb") as f:
+                import_snapshot(f.read())
 
         # Expose helper functions for the web interface
         mcp.list_collected = list_collected.fn  # type: ignore[attr-defined]
         mcp.remove_collected = remove_collected.fn  # type: ignore[attr-defined]
-        mcp.ingest_snippet = ingest_python.fn  # type: ignore[attr-defined]
+        mcp.ingest_snippet = ingest_snippet  # type: ignore[attr-defined]
         # Expose maps for the web interface
         mcp.module_tool_map = module_tool_map  # type: ignore[attr-defined]
         mcp.module_params = module_params_map  # type: ignore[attr-defined]
         mcp.forge_health = forge_health.fn  # type: ignore[attr-defined]
+        mcp.registry_store = REG  # type: ignore[attr-defined]
+        mcp.admission = admission  # type: ignore[attr-defined]
+        mcp.submit_ingest = submit_ingest  # type: ignore[attr-defined]
+        mcp.jobs = jobs  # type: ignore[attr-defined]
+        mcp.call_batch = call_batch  # type: ignore[attr-defined]
+        mcp.update_tool = update_tool  # type: ignore[attr-defined]
+        mcp.rollback_tool = rollback_tool  # type: ignore[attr-defined]
+        mcp.import_snapshot = import_snapshot  # type: ignore[attr-defined]
+        mcp.export_registry = export_registry  # type: ignore[attr-defined]
+        mcp.search_tools = search_tools.fn  # type: ignore[attr-defined]
+        mcp.profile_tool = profile_tool.fn  # type: ignore[attr-defined]
+        mcp.audit = audit  # type: ignore[attr-defined]
 
         return mcp
     return _impl()
 
 
-def build_app():
+def _transport_mounts(mcp) -> List[Tuple[str, Any]]:
+    """
+    Build the MCP transport apps selected by ``MCP_TRANSPORT``.
+
+    ``MCP_TRANSPORT`` is a comma-separated list of ``sse`` and ``http`` (alias
+    ``streamable-http``); ``all`` or an unset variable mounts both.  SSE is
+    served under ``/sse`` and streamable HTTP under ``/mcp``.  Set
+    ``MCP_HTTP_STATELESS=1`` to run streamable HTTP without per-client
+    sessions and ``MCP_HTTP_JSON_RESPONSE=1`` to answer with plain JSON bodies
+    instead of SSE-framed responses, which suits buffering HTTP/1.1 proxies.
+    """
+    def _impl() -> List[Tuple[str, Any]]:
+        import os
+
+        def _flag(name: str) -> bool:
+            return os.getenv(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+        raw = os.getenv("MCP_TRANSPORT", "all").strip().lower() or "all"
+        selected = {t.strip() for t in raw.split(",") if t.strip()}
+        if "all" in selected:
+            selected = {"sse", "http"}
+        if "streamable-http" in selected:
+            selected.discard("streamable-http")
+            selected.add("http")
+        unknown = selected - {"sse", "http"}
+        if unknown or not selected:
+            raise ValueError(f"Unsupported MCP_TRANSPORT {raw!r}; use sse, http, streamable-http or all.")
+        mounts: List[Tuple[str, Any]] = []
+        if "sse" in selected:
+            mounts.append(("/sse", mcp.http_app(path="/", transport="sse")))
+        if "http" in selected:
+            mounts.append(("/mcp", mcp.http_app(
+                path="/",
+                transport="http",
+                stateless_http=_flag("MCP_HTTP_STATELESS"),
+                json_response=_flag("MCP_HTTP_JSON_RESPONSE"),
+            )))
+        return mounts
+    return _impl()
+
+
+def _transports_lifespan(mounts: List[Tuple[str, Any]]):
+    """Return a lifespan that runs every mounted transport's own lifespan."""
+    def _impl():
+        import contextlib
+
+        @contextlib.asynccontextmanager
+        async def lifespan(_app):
+            # Streamable HTTP needs its session manager running for the app's lifetime.
+            async with contextlib.AsyncExitStack() as stack:
+                for _path, sub in mounts:
+                    await stack.enter_async_context(sub.lifespan(sub))
+                yield
+
+        return lifespan
+    return _impl()
+
+
+def build_headless_app(
+    registry_dir: str | None = None,
+    registry_backend: str | None = None,
+    snapshot: str | None = None,
+):
+    """
+    Create a bare Starlette app serving only the MCP transports and ``/health``.
+
+    This is the MCP-only deployment mode: FastAPI, Jinja2 and the templates
+    are never imported.
+    """
+    def _impl():
+        from starlette.applications import Starlette
+        from starlette.responses import PlainTextResponse
+        from starlette.routing import Mount, Route
+
+        mcp = build_server(registry_dir, registry_backend, snapshot)
+        mounts = _transport_mounts(mcp)
+
+        async def health(_request):
+            return PlainTextResponse(mcp.forge_health())
+
+        routes = [Route("/health", health)] + [Mount(path, app=sub) for path, sub in mounts]
+        return Starlette(routes=routes, lifespan=_transports_lifespan(mounts))
+    return _impl()
+
+
+def build_app(
+    registry_dir: str | None = None,
+    registry_backend: str | None = None,
+    snapshot: str | None = None,
+):
     """Create the FastAPI web application that wraps the MCP server."""
 
-    mcp = build_server()
+    mcp = build_server(registry_dir, registry_backend, snapshot)
 
     from fastapi import FastAPI, Request, HTTPException, Response
     from fastapi.responses import PlainTextResponse, HTMLResponse, JSONResponse
     from fastapi.templating import Jinja2Templates
+    from starlette.concurrency import run_in_threadpool
+    from .admission import AdmissionError
+    from .jobs import PENDING
     globals()["Request"] = Request
     globals()["Response"] = Response
 
-    app = FastAPI(title="MCPForge Web UI")
+    mounts = _transport_mounts(mcp)
+    app = FastAPI(title="MCPForge Web UI", lifespan=_transports_lifespan(mounts))
     templates = Jinja2Templates(directory="app/templates")
 
+    def _client(request: Request) -> str | None:
+        return request.client.host if request.client else None
+
+    async def _json_object(request: Request) -> Dict[str, Any]:
+        """Return the request's JSON body, or fail with 400 unless it is an object."""
+        import json
+        try:
+            data = await request.json()
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise HTTPException(400, "request body must be valid JSON")
+        if not isinstance(data, dict):
+            raise HTTPException(400, "request body must be a JSON object")
+        return data
+
+    async def _audit_rest(
+        kind: str, tool_name: str, request: Request, started: float, in_bytes: int,
+        out_bytes: int = 0, error: str | None = None,
+    ) -> None:
+        """Queue an audit record for a tool run through a REST route."""
+        import time
+        await mcp.audit.arecord(
+            kind, tool_name, _client(request), (time.perf_counter() - started) * 1000, in_bytes, out_bytes,
+            "ok" if error is None else "error", error, "rest",
+        )
+
+    @app.exception_handler(AdmissionError)
+    async def admission_rejected(request: Request, exc: AdmissionError) -> Response:
+        import math
+        headers = {"Retry-After": str(max(1, math.ceil(exc.retry_after))), "HX-Trigger": "toolError"}
+        return JSONResponse({"detail": str(exc)}, status_code=exc.status, headers=headers)
+
     @app.get("/health")
     async def web_health() -> PlainTextResponse:
         return PlainTextResponse(mcp.forge_health())
 
     @app.get("/tools")
-    async def web_list_tools() -> list[str]:
-        return mcp.list_collected()
+    async def web_list_tools(request: Request) -> Response:
+        tools = mcp.list_collected()
+        if request.headers.get("hx-request"):
+            return templates.TemplateResponse("tools.html", {"request": request, "tools": tools})
+        return JSONResponse(tools)
 
-    @app.post("/tools", status_code=201)
-    async def web_create_tool(request: Request) -> Response:
+    async def _snippet_form(request: Request) -> Tuple[str, str]:
         if request.headers.get("content-type", "").startswith("application/json"):
             data = await request.json()
         else:
@@ -255,7 +856,13 @@ def build_app():
         import os
         if not os.getenv("OPENAI_API_KEY"):
             os.environ["USE_MOCK_LLM"] = "1"
-        result = mcp.ingest_snippet(snippet_name, code)
+        return snippet_name, code
+
+    @app.post("/tools", status_code=201)
+    async def web_create_tool(request: Request) -> Response:
+        snippet_name, code = await _snippet_form(request)
+        mcp.admission.check_call(_client(request), "collector.ingest_python")
+        result = await run_in_threadpool(mcp.ingest_snippet, snippet_name, code, "rest", _client(request))
         status = 201 if result.get("created") else 400
         if request.headers.get("hx-request"):
             tools = mcp.list_collected()
@@ -266,6 +873,140 @@ def build_app():
             )
         return JSONResponse(result, status_code=status)
 
+    @app.get("/tools/search")
+    async def web_search_tools(request: Request, q: str = "", limit: int = 10) -> Response:
+        mcp.admission.check_call(_client(request), "collector.search")
+        return JSONResponse(mcp.search_tools(q, limit))
+
+    @app.post("/tools/batch")
+    async def web_call_batch(request: Request) -> Response:
+        data = await _json_object(request)
+        tool_name = data.get("tool_name")
+        items = data.get("items")
+        if not tool_name or not isinstance(items, list):
+            raise HTTPException(400, "tool_name and items (a list of argument objects) required")
+        try:
+            max_parallel = int(data.get("max_parallel", 1))
+        except (TypeError, ValueError):
+            raise HTTPException(400, "max_parallel must be an integer")
+        mcp.admission.check_call(_client(request), "collector.call_batch")
+        import json
+        import time
+        started = time.perf_counter()
+        in_bytes = len(json.dumps(items, default=str))
+        try:
+            result = await run_in_threadpool(mcp.call_batch, tool_name, items, max_parallel)
+        except (LookupError, ValueError) as exc:
+            await _audit_rest("batch", tool_name, request, started, in_bytes, error=f"{type(exc).__name__}: {exc}"[:500])
+            raise HTTPException(404 if isinstance(exc, LookupError) else 413, str(exc))
+        body = JSONResponse(result)
+        failed = result["failed"]
+        await _audit_rest(
+            "batch", tool_name, request, started, in_bytes, len(body.body),
+            f"{failed} of {len(items)} items failed" if failed else None,
+        )
+        return body
+
+    @app.put("/tools/{module}")
+    async def web_update_tool(module: str, request: Request) -> Response:
+        tool_name = mcp.module_tool_map.get(module)
+        if not tool_name:
+            raise HTTPException(404, "module not found")
+        data = await _json_object(request)
+        if not data.get("code"):
+            raise HTTPException(400, "code required")
+        mcp.admission.check_call(_client(request), "collector.update")
+        try:
+            result = await run_in_threadpool(
+                mcp.update_tool, tool_name, data["code"], data.get("function_name"), data.get("description")
+            )
+        except ValueError as exc:
+            raise HTTPException(400, str(exc))
+        return JSONResponse(result)
+
+    @app.post("/tools/{module}/rollback")
+    async def web_rollback_tool(module: str, request: Request) -> Response:
+        tool_name = mcp.module_tool_map.get(module)
+        if not tool_name:
+            raise HTTPException(404, "module not found")
+        mcp.admission.check_call(_client(request), "collector.rollback")
+        try:
+            result = await run_in_threadpool(mcp.rollback_tool, tool_name)
+        except ValueError as exc:
+            raise HTTPException(409, str(exc))
+        return JSONResponse(result)
+
+    @app.get("/admin/snapshot")
+    async def web_export_snapshot(request: Request, bytecode: bool = True) -> Response:
+        mcp.admission.check_call(_client(request), "admin.snapshot")
+        blob = await run_in_threadpool(mcp.export_registry, bytecode)
+        headers = {"Content-Disposition": 'attachment; filename="mcpforge-registry.snapshot"'}
+        return Response(blob, media_type="application/octet-stream", headers=headers)
+
+    @app.post("/admin/snapshot")
+    async def web_import_snapshot(request: Request) -> Response:
+        from .snapshot import SnapshotError
+        mcp.admission.check_call(_client(request), "admin.snapshot")
+        blob = await request.body()
+        try:
+            result = await run_in_threadpool(mcp.import_snapshot, blob)
+        except SnapshotError as exc:
+            raise HTTPException(400, str(exc))
+        headers = {"HX-Trigger": "toolAdded"} if result["imported"] else {}
+        return JSONResponse(result, headers=headers)
+
+    @app.get("/admin/profiles")
+    async def web_profiling_status(request: Request) -> Response:
+        mcp.admission.check_call(_client(request), "admin.profiles")
+        return JSONResponse(mcp.profiler.status())
+
+    @app.get("/admin/profiles/{tool_name}")
+    async def web_profile_report(tool_name: str, request: Request, limit: int = 25) -> Response:
+        mcp.admission.check_call(_client(request), "admin.profiles")
+        report = mcp.profiler.report(tool_name, max(1, min(limit, 200)))
+        if report is None:
+            raise HTTPException(404, "no profile for this tool")
+        return JSONResponse(report)
+
+    @app.get("/admin/profiles/{tool_name}/pstats")
+    async def web_download_profile(tool_name: str, request: Request) -> Response:
+        mcp.admission.check_call(_client(request), "admin.profiles")
+        blob = mcp.profiler.dump(tool_name)
+        if blob is None:
+            raise HTTPException(404, "no sampled profile for this tool")
+        from .registry import safe_mod_name
+        headers = {"Content-Disposition": f'attachment; filename="{safe_mod_name(tool_name)}.pstats"'}
+        return Response(blob, media_type="application/octet-stream", headers=headers)
+
+    @app.get("/admin/audit")
+    async def web_audit_report(request: Request, window: float = 900) -> Response:
+        mcp.admission.check_call(_client(request), "admin.audit")
+        return JSONResponse(mcp.audit.aggregates(window))
+
+    @app.post("/jobs", status_code=202)
+    async def web_submit_job(request: Request) -> Response:
+        snippet_name, code = await _snippet_form(request)
+        mcp.admission.check_call(_client(request), "collector.ingest_python")
+        job_id = mcp.submit_ingest(snippet_name, code, _client(request))
+        job = mcp.jobs.get(job_id)
+        if request.headers.get("hx-request"):
+            return templates.TemplateResponse("job.html", {"request": request, "job": job}, status_code=202)
+        return JSONResponse({"job_id": job_id, "status": job["status"], "status_url": f"/jobs/{job_id}"}, status_code=202)
+
+    @app.get("/jobs/{job_id}")
+    async def web_job_status(job_id: str, request: Request) -> Response:
+        job = mcp.jobs.get(job_id)
+        if job is None:
+            raise HTTPException(404, "job not found")
+        if request.headers.get("hx-request"):
+            headers = {}
+            if job["status"] == "succeeded" and (job["result"] or {}).get("created"):
+                headers["HX-Trigger"] = "toolAdded"
+            elif job["status"] not in PENDING:
+                headers["HX-Trigger"] = "toolError"
+            return templates.TemplateResponse("job.html", {"request": request, "job": job}, headers=headers)
+        return JSONResponse(job)
+
     @app.delete("/tools/{module}")
     async def web_remove_tool(module: str, request: Request) -> Response:
         ok = mcp.remove_collected(module)
@@ -283,9 +1024,20 @@ def build_app():
         params = mcp.module_params.get(module)
         if not tool_name or params is None:
             raise HTTPException(404, "module not found")
+        mcp.admission.check_call(_client(request), tool_name)
+        import json
+        import time
+        started = time.perf_counter()
+        in_bytes = len(json.dumps(params, default=str))
         tool = await mcp.get_tool(tool_name)
-        result = await tool.run(params)
-        output = result.structured_content or {"result": "".join(getattr(c, "text", "") for c in result.content)}
+        try:
+            result = await tool.run(params)
+        except Exception as exc:
+            await _audit_rest("call", tool_name, request, started, in_bytes, error=f"{type(exc).__name__}: {exc}"[:500])
+            raise
+        text = "".join(getattr(c, "text", "") for c in result.content)
+        await _audit_rest("call", tool_name, request, started, in_bytes, len(text))
+        output = result.structured_content or {"result": text}
         if request.headers.get("hx-request"):
             return PlainTextResponse(f"{tool_name}({params}) -> {output}")
         return JSONResponse({"params": params, "output": output})
@@ -295,19 +1047,38 @@ def build_app():
         tools = mcp.list_collected()
         return templates.TemplateResponse("index.html", {"request": request, "tools": tools})
 
-    # Mount the MCP server's SSE app under /sse
-    app.mount("/sse", mcp.sse_app(path="/"))
+    # Mount the MCP transports (SSE under /sse, streamable HTTP under /mcp)
+    for path, sub in mounts:
+        app.mount(path, sub)
 
     return app
 
-def main(host: str | None = None, port: int | None = None):
-    """Run the combined MCP and web servers on a single port."""
+def main(
+    host: str | None = None,
+    port: int | None = None,
+    registry_dir: str | None = None,
+    registry_backend: str | None = None,
+    headless: bool | None = None,
+    snapshot: str | None = None,
+):
+    """
+    Run the combined MCP and web servers on a single port.
+
+    With ``headless`` (or ``MCPFORGE_HEADLESS=1``) only the MCP transports and
+    ``/health`` are served and the web UI stack is never imported.  ``snapshot``
+    is a registry snapshot file to import before serving.
+    """
 
     def _impl():
         import os
         import uvicorn
 
-        app = build_app()
+        if headless is None:
+            use_headless = os.getenv("MCPFORGE_HEADLESS", "").strip().lower() in ("1", "true", "yes", "on")
+        else:
+            use_headless = headless
+        factory = build_headless_app if use_headless else build_app
+        app = factory(registry_dir, registry_backend, snapshot)
         h = host or os.getenv("HOST", "127.0.0.1")
         p = port or int(os.getenv("PORT", "8000"))
         uvicorn.run(app, host=h, port=p)
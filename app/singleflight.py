@@ -0,0 +1,76 @@
+"""
+In-process single-flight deduplication.
+
+When several threads ask for the same work at the same time, only the first
+(the leader) runs it; the others wait and receive the leader's result or
+exception.  Nothing is cached: once the flight lands, the next call for the
+same key runs the work again.
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Dict, Tuple
+
+
+def content_key(*parts: Any) -> str:
+    """Return a stable SHA-256 key for JSON-serialisable ``parts``."""
+    def _impl() -> str:
+        import hashlib
+        import json
+        blob = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(blob).hexdigest()
+    return _impl()
+
+
+class _Flight:
+    def __init__(self) -> None:
+        import threading
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution."""
+
+    def __init__(self) -> None:
+        import threading
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run ``fn`` unless a call with ``key`` is already in flight.
+
+        Returns ``(result, shared)`` where ``shared`` is ``True`` for callers
+        that received another caller's result.  Followers get a deep copy so
+        they can mutate it freely.
+        """
+        import copy
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.followers += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result), True
+        try:
+            flight.result = fn()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed."""
+        with self._lock:
+            return len(self._flights)
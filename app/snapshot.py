@@ -0,0 +1,142 @@
+"""
+Registry snapshots: the whole registry as one checksummed archive.
+
+A snapshot file looks like this::
+
+    MCPFORGE-SNAPSHOT <format>\\n
+    <header JSON>\\n
+    <zlib-compressed JSON payload>
+
+The header records the SHA-256 and size of the compressed payload, the module
+count and the bytecode magic number of the exporting interpreter.  The payload
+lists every module's generated source and metadata and, optionally, the
+marshalled code object of the generated module.  Bytecode is used on import
+only when the importing interpreter has the same magic number. Otherwise the
+source is compiled as usual.
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, List
+
+MAGIC = b"MCPFORGE-SNAPSHOT"
+FORMAT = 1
+
+
+class SnapshotError(ValueError):
+    """A snapshot is malformed, truncated or fails its checksum."""
+
+
+def export_snapshot(store, include_bytecode: bool = True) -> bytes:
+    """Serialise every module in ``store`` into a snapshot archive."""
+    def _impl() -> bytes:
+        import base64
+        import hashlib
+        import importlib.util
+        import json
+        import marshal
+        import time
+        import zlib
+        modules: List[Dict[str, Any]] = []
+        for name in store.modules():
+            source = store.read_source(name)
+            if source is None:
+                continue
+            entry: Dict[str, Any] = {"name": name, "source": source, "meta": store.read_meta(name) or {}}
+            if include_bytecode:
+                try:
+                    code = compile(source, f"<registry:{name}>", "exec")
+                except SyntaxError:
+                    pass
+                else:
+                    entry["bytecode"] = base64.b64encode(marshal.dumps(code)).decode("ascii")
+            modules.append(entry)
+        payload = zlib.compress(json.dumps({"modules": modules}).encode("utf-8"), 6)
+        header = {
+            "format": FORMAT,
+            "created_at": time.time(),
+            "modules": len(modules),
+            "size": len(payload),
+            "sha256": hashlib.sha256(payload).hexdigest(),
+            "bytecode_magic": importlib.util.MAGIC_NUMBER.hex() if include_bytecode else None,
+        }
+        return b"%s %d\n%s\n%s" % (MAGIC, FORMAT, json.dumps(header).encode("utf-8"), payload)
+    return _impl()
+
+
+def read_snapshot(blob: bytes) -> List[Dict[str, Any]]:
+    """
+    Verify and unpack a snapshot archive.
+
+    Returns one ``{"name", "source", "meta", "code"}`` dict per module, where
+    ``code`` is a ready code object for the generated module or ``None``.
+    Raises :class:`SnapshotError` if the archive is damaged or unsupported.
+    """
+    def _impl() -> List[Dict[str, Any]]:
+        import base64
+        import binascii
+        import hashlib
+        import importlib.util
+        import json
+        import marshal
+        import types
+        import zlib
+        from .registry import safe_mod_name
+        try:
+            first, header_line, payload = blob.split(b"\n", 2)
+            magic, version = first.split(b" ")
+            version = int(version)
+            header = json.loads(header_line)
+        except ValueError as exc:
+            raise SnapshotError("not an MCPForge registry snapshot") from exc
+        if magic != MAGIC or not isinstance(header, dict):
+            raise SnapshotError("not an MCPForge registry snapshot")
+        if version != FORMAT:
+            raise SnapshotError(f"unsupported snapshot format {version}")
+        if len(payload) != header.get("size") or hashlib.sha256(payload).hexdigest() != header.get("sha256"):
+            raise SnapshotError("snapshot checksum mismatch")
+        try:
+            modules = json.loads(zlib.decompress(payload))["modules"]
+        except (zlib.error, ValueError, KeyError) as exc:
+            raise SnapshotError(f"corrupt snapshot payload: {exc}") from exc
+        if not isinstance(modules, list):
+            raise SnapshotError("corrupt snapshot payload: modules is not a list")
+        use_bytecode = header.get("bytecode_magic") == importlib.util.MAGIC_NUMBER.hex()
+        entries: List[Dict[str, Any]] = []
+        for entry in modules:
+            if not (
+                isinstance(entry, dict)
+                and isinstance(entry.get("name"), str)
+                and isinstance(entry.get("source"), str)
+                and isinstance(entry.get("meta") or {}, dict)
+            ):
+                raise SnapshotError("corrupt snapshot entry")
+            name = entry["name"]
+            # Names become file names in the registry store.
+            if safe_mod_name(name) != name:
+                raise SnapshotError(f"invalid module name in snapshot: {name!r}")
+            code = None
+            if use_bytecode and entry.get("bytecode"):
+                try:
+                    code = marshal.loads(base64.b64decode(entry["bytecode"], validate=True))
+                except (binascii.Error, ValueError, EOFError, TypeError) as exc:
+                    raise SnapshotError(f"corrupt bytecode for {name}: {exc}") from exc
+                if not isinstance(code, types.CodeType):
+                    raise SnapshotError(f"corrupt bytecode for {name}")
+            entries.append({"name": name, "source": entry["source"], "meta": entry.get("meta") or {}, "code": code})
+        return entries
+    return _impl()
+
+
+def snapshot_store(store, path: str, include_bytecode: bool = True) -> int:
+    """Write a snapshot of ``store`` to ``path`` atomically; return its size in bytes."""
+    def _impl() -> int:
+        import os
+        blob = export_snapshot(store, include_bytecode)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        return len(blob)
+    return _impl()
@@ -0,0 +1,248 @@
+"""
+Pluggable storage backends for the tool registry.
+
+A registry store keeps, for every collected module, the generated Python
+source and a small JSON metadata document.  Three backends are available:
+
+* ``file`` – on-disk storage (the default, ``./registry``).  Writes go to a
+  temporary file that is moved into place with ``os.replace``, so a crashed
+  process never leaves a half-written module behind.  Files are not fsynced
+  unless ``MCPFORGE_REGISTRY_FSYNC`` is set, because two ``fsync`` calls per
+  module would dominate ingest latency.  With it set, modules also survive
+  power loss.
+* ``tmpfs`` – the same on-disk layout, never fsynced, rooted on a RAM-backed
+  filesystem (``/dev/shm`` when available).  Suitable for high-churn nodes
+  that can afford to lose the registry on reboot.
+* ``memory`` – a pure in-process dictionary.  No filesystem I/O at all, which
+  makes it the right choice for ephemeral deployments and tests.
+
+Backends are selected with :func:`open_store`, usually from the
+``MCPFORGE_REGISTRY_BACKEND`` and ``MCPFORGE_REGISTRY_DIR`` environment
+variables.
+"""
+
+from __future__ import annotations
+import abc
+from typing import Any, Dict, List
+
+DEFAULT_REGISTRY_DIR = "./registry"
+BACKENDS = ("file", "tmpfs", "memory")
+
+
+class RegistryStore(abc.ABC):
+    """Interface shared by every registry backend."""
+
+    backend = "abstract"
+    #: Filesystem directory backing the store, or ``None`` for memory stores.
+    location: str | None = None
+
+    @abc.abstractmethod
+    def write(self, module_name: str, source: str, meta: Dict[str, Any]) -> str:
+        """Persist ``source`` and ``meta`` for ``module_name`` and return its address."""
+
+    def write_many(self, entries: List[tuple[str, str, Dict[str, Any]]]) -> None:
+        """Persist many ``(module_name, source, meta)`` entries, e.g. from a snapshot."""
+        for module_name, source, meta in entries:
+            self.write(module_name, source, meta)
+
+    @abc.abstractmethod
+    def delete(self, module_name: str) -> bool:
+        """Remove ``module_name``; return ``True`` if anything was removed."""
+
+    @abc.abstractmethod
+    def modules(self) -> List[str]:
+        """Return the sorted names of all stored modules."""
+
+    @abc.abstractmethod
+    def read_source(self, module_name: str) -> str | None:
+        """Return the generated source for ``module_name`` or ``None``."""
+
+    @abc.abstractmethod
+    def read_meta(self, module_name: str) -> Dict[str, Any] | None:
+        """Return the metadata for ``module_name`` or ``None``."""
+
+    def address(self, module_name: str) -> str:
+        """Return a filename-like label used when compiling ``module_name``."""
+        return f"<registry:{module_name}>"
+
+    def describe(self) -> str:
+        """Return a short human-readable description of the store."""
+        return f"{self.backend}:{self.location or '-'}"
+
+
+class MemoryRegistryStore(RegistryStore):
+    """Keep registry modules in a process-local dictionary."""
+
+    backend = "memory"
+
+    def __init__(self) -> None:
+        import threading
+        self._lock = threading.Lock()
+        self._entries: Dict[str, tuple[str, Dict[str, Any]]] = {}
+
+    def write(self, module_name: str, source: str, meta: Dict[str, Any]) -> str:
+        import copy
+        with self._lock:
+            self._entries[module_name] = (source, copy.deepcopy(meta))
+        return self.address(module_name)
+
+    def delete(self, module_name: str) -> bool:
+        with self._lock:
+            return self._entries.pop(module_name, None) is not None
+
+    def modules(self) -> List[str]:
+        with self._lock:
+            return sorted(self._entries)
+
+    def read_source(self, module_name: str) -> str | None:
+        entry = self._entries.get(module_name)
+        return entry[0] if entry else None
+
+    def read_meta(self, module_name: str) -> Dict[str, Any] | None:
+        import copy
+        entry = self._entries.get(module_name)
+        return copy.deepcopy(entry[1]) if entry else None
+
+
+class FileRegistryStore(RegistryStore):
+    """Store each module as ``<name>.py`` plus ``<name>.json`` in a directory."""
+
+    backend = "file"
+
+    def __init__(self, base_dir: str, durable: bool = False) -> None:
+        self.location = base_dir
+        self.durable = durable
+
+    def _path(self, module_name: str, ext: str) -> str:
+        import os
+        return os.path.join(self.location or "", f"{module_name}{ext}")
+
+    def _atomic_write(self, path: str, text: str) -> None:
+        import os
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+            if self.durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def write(self, module_name: str, source: str, meta: Dict[str, Any]) -> str:
+        import os
+        import json
+        os.makedirs(self.location or ".", exist_ok=True)
+        path = self._path(module_name, ".py")
+        self._atomic_write(path, source)
+        # Persist metadata (example parameters etc.) alongside the module
+        self._atomic_write(self._path(module_name, ".json"), json.dumps(meta))
+        return path
+
+    def write_many(self, entries: List[tuple[str, str, Dict[str, Any]]]) -> None:
+        # Group commit: write every temp file, then fsync them back to back,
+        # rename them all and fsync the directory once.
+        import os
+        import json
+        os.makedirs(self.location or ".", exist_ok=True)
+        staged = []
+        for module_name, source, meta in entries:
+            for path, text in ((self._path(module_name, ".py"), source), (self._path(module_name, ".json"), json.dumps(meta))):
+                tmp = f"{path}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(text)
+                staged.append((tmp, path))
+        if self.durable:
+            for tmp, _path in staged:
+                fd = os.open(tmp, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+        for tmp, path in staged:
+            os.replace(tmp, path)
+        if self.durable:
+            fd = os.open(self.location or ".", os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def delete(self, module_name: str) -> bool:
+        import os
+        removed = False
+        for ext in (".py", ".json"):
+            path = self._path(module_name, ext)
+            if os.path.exists(path):
+                os.remove(path)
+                removed = True
+        return removed
+
+    def modules(self) -> List[str]:
+        import os
+        if not os.path.isdir(self.location or ""):
+            return []
+        return sorted(
+            os.path.splitext(fn)[0]
+            for fn in os.listdir(self.location or "")
+            if fn.endswith(".py")
+        )
+
+    def read_source(self, module_name: str) -> str | None:
+        try:
+            with open(self._path(module_name, ".py"), "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def read_meta(self, module_name: str) -> Dict[str, Any] | None:
+        import json
+        try:
+            with open(self._path(module_name, ".json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return None
+
+    def address(self, module_name: str) -> str:
+        return self._path(module_name, ".py")
+
+
+class TmpfsRegistryStore(FileRegistryStore):
+    """File layout on a RAM-backed filesystem, without ``fsync`` on write."""
+
+    backend = "tmpfs"
+
+    def __init__(self, base_dir: str | None = None) -> None:
+        super().__init__(base_dir or default_tmpfs_dir(), durable=False)
+
+
+def default_tmpfs_dir() -> str:
+    """Return a registry directory on tmpfs, falling back to the temp dir."""
+    def _impl() -> str:
+        import os
+        import tempfile
+        root = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+        return os.path.join(root, "mcpforge-registry")
+    return _impl()
+
+
+def open_store(backend: str | None = None, location: str | None = None) -> RegistryStore:
+    """
+    Create the registry store selected by ``backend`` and ``location``.
+
+    Missing arguments fall back to the ``MCPFORGE_REGISTRY_BACKEND`` and
+    ``MCPFORGE_REGISTRY_DIR`` environment variables, then to a file store in
+    ``./registry``.  ``MCPFORGE_REGISTRY_FSYNC`` makes the file store fsync
+    every write.
+    """
+    def _impl() -> RegistryStore:
+        import os
+        kind = (backend or os.getenv("MCPFORGE_REGISTRY_BACKEND") or "file").strip().lower()
+        where = location or os.getenv("MCPFORGE_REGISTRY_DIR")
+        if kind == "memory":
+            return MemoryRegistryStore()
+        if kind == "tmpfs":
+            return TmpfsRegistryStore(where)
+        if kind == "file":
+            durable = os.getenv("MCPFORGE_REGISTRY_FSYNC", "").strip().lower() in ("1", "true", "yes", "on")
+            return FileRegistryStore(where or DEFAULT_REGISTRY_DIR, durable)
+        raise ValueError(f"Unknown registry backend {kind!r}; expected one of {', '.join(BACKENDS)}.")
+    return _impl()
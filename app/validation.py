@@ -0,0 +1,407 @@
+"""
+Precompiled argument validation for collected tools.
+
+Each collected tool stores its ``(name, annotation)`` pairs in the registry
+metadata.  When the module is loaded they are compiled once into a validator
+that checks and coerces call arguments without going through pydantic. The
+validator also produces the JSON input schema the tool publishes.  Bad calls are
+rejected before any snippet code runs.
+
+Supported annotations are ``int``, ``float``, ``str``, ``bool``, ``list`` /
+``List[X]`` / ``tuple`` / ``set``, ``dict`` / ``Dict[K, V]``, ``Optional[X]``,
+``Union[...]`` / ``X | Y`` and ``Any``.  Anything else is accepted unchanged.
+Coercion is lenient in the same places pydantic's lax mode is: numeric strings
+become numbers, integral floats become ints and ``"true"``/``"false"`` become
+booleans.
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+_TRUE = ("true", "1", "yes", "on")
+_FALSE = ("false", "0", "no", "off")
+
+
+class ArgumentError(ValueError):
+    """Call arguments do not match a tool's declared parameters."""
+
+
+class _Invalid(Exception):
+    pass
+
+
+def _parse(annotation: str):
+    """Return ``(kind, params)`` for an annotation string."""
+    import ast
+    try:
+        node = ast.parse(annotation.strip() or "Any", mode="eval").body
+    except SyntaxError:
+        return ("any", ())
+    return _from_node(node)
+
+
+def _from_node(node) -> Tuple[str, tuple]:
+    import ast
+    if isinstance(node, ast.Constant) and node.value is None:
+        return ("none", ())
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return _parse(node.value)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        return ("union", (_from_node(node.left), _from_node(node.right)))
+    name = node
+    args: list = []
+    if isinstance(node, ast.Subscript):
+        name = node.value
+        inner = node.slice
+        args = list(inner.elts) if isinstance(inner, ast.Tuple) else [inner]
+    if isinstance(name, ast.Attribute):
+        ident = name.attr
+    elif isinstance(name, ast.Name):
+        ident = name.id
+    else:
+        return ("any", ())
+    ident = ident.lower()
+    if ident in ("int", "float", "str", "bool"):
+        return (ident, ())
+    if ident in ("list", "tuple", "set", "frozenset", "sequence", "iterable"):
+        items = [a for a in args if not (isinstance(a, ast.Constant) and a.value is Ellipsis)]
+        return ("list", (_from_node(items[0]),) if len(items) == 1 else ())
+    if ident in ("dict", "mapping"):
+        return ("dict", (_from_node(args[1]),) if len(args) == 2 else ())
+    if ident == "optional" and args:
+        return ("union", (_from_node(args[0]), ("none", ())))
+    if ident == "union" and args:
+        return ("union", tuple(_from_node(a) for a in args))
+    return ("any", ())
+
+
+def _schema(parsed: Tuple[str, tuple]) -> Dict[str, Any]:
+    kind, params = parsed
+    if kind in ("int", "float", "str", "bool", "none"):
+        return {"type": {"int": "integer", "float": "number", "str": "string", "bool": "boolean", "none": "null"}[kind]}
+    if kind == "list":
+        return {"type": "array", "items": _schema(params[0])} if params else {"type": "array"}
+    if kind == "dict":
+        return {"type": "object", "additionalProperties": _schema(params[0])} if params else {"type": "object"}
+    if kind == "union":
+        return {"anyOf": [_schema(p) for p in params]}
+    return {}
+
+
+def _checker(parsed: Tuple[str, tuple]) -> Callable[[Any], Any]:
+    """Build a function that coerces one value or raises ``_Invalid``."""
+    import math
+    kind, params = parsed
+
+    if kind == "int":
+        def check(v):
+            if type(v) is int:
+                return v
+            if isinstance(v, float) and v.is_integer():
+                return int(v)
+            if isinstance(v, str):
+                try:
+                    return int(v.strip())
+                except ValueError:
+                    pass
+            raise _Invalid("expected integer")
+    elif kind == "float":
+        def check(v):
+            if isinstance(v, (int, float)) and not isinstance(v, bool):
+                return float(v)
+            if isinstance(v, str):
+                try:
+                    out = float(v.strip())
+                except ValueError:
+                    pass
+                else:
+                    if math.isfinite(out):
+                        return out
+            raise _Invalid("expected number")
+    elif kind == "str":
+        def check(v):
+            if isinstance(v, str):
+                return v
+            raise _Invalid("expected string")
+    elif kind == "bool":
+        def check(v):
+            if isinstance(v, bool):
+                return v
+            if v in (0, 1) and type(v) is int:
+                return bool(v)
+            if isinstance(v, str) and v.strip().lower() in _TRUE + _FALSE:
+                return v.strip().lower() in _TRUE
+            raise _Invalid("expected boolean")
+    elif kind == "none":
+        def check(v):
+            if v is None:
+                return v
+            raise _Invalid("expected null")
+    elif kind == "list":
+        item = _checker(params[0]) if params else None
+
+        def check(v):
+            if not isinstance(v, (list, tuple)):
+                raise _Invalid("expected array")
+            if item is None:
+                return list(v)
+            out = []
+            for i, x in enumerate(v):
+                try:
+                    out.append(item(x))
+                except _Invalid as exc:
+                    raise _Invalid(f"item {i}: {exc}") from None
+            return out
+    elif kind == "dict":
+        value = _checker(params[0]) if params else None
+
+        def check(v):
+            if not isinstance(v, dict):
+                raise _Invalid("expected object")
+            if value is None:
+                return v
+            out = {}
+            for k, x in v.items():
+                try:
+                    out[k] = value(x)
+                except _Invalid as exc:
+                    raise _Invalid(f"key {k!r}: {exc}") from None
+            return out
+    elif kind == "union":
+        options = [(p[0], _checker(p)) for p in params]
+
+        def check(v):
+            # Prefer an option the value already matches, so "1" stays a
+            # string in Union[str, int]; then fall back to coercion.
+            ordered = [c for k, c in options if _matches(k, v)] + [c for k, c in options if not _matches(k, v)]
+            for c in ordered:
+                try:
+                    return c(v)
+                except _Invalid:
+                    continue
+            raise _Invalid("does not match any allowed type")
+    else:
+        def check(v):
+            return v
+    return check
+
+
+def _matches(kind: str, v: Any) -> bool:
+    """Whether ``v`` already has the Python type for ``kind`` (no coercion)."""
+    if kind == "none":
+        return v is None
+    if kind == "int":
+        return type(v) is int
+    if kind == "float":
+        return isinstance(v, (int, float)) and not isinstance(v, bool)
+    if kind in ("str", "bool"):
+        return isinstance(v, {"str": str, "bool": bool}[kind])
+    if kind == "list":
+        return isinstance(v, (list, tuple))
+    if kind == "dict":
+        return isinstance(v, dict)
+    return True
+
+
+#: Names a generated wrapper may use in its signature; its module imports the
+#: ``typing`` ones.
+WRAPPER_NAMES = frozenset({
+    "int", "float", "str", "bool", "bytes", "list", "dict", "tuple", "set", "frozenset",
+    "Any", "Dict", "FrozenSet", "Iterable", "List", "Mapping", "Optional", "Sequence", "Set", "Tuple", "Union",
+})
+
+
+def wrapper_annotation(annotation: str) -> str:
+    """
+    Return ``annotation`` if a generated wrapper can declare it, else ``"Any"``.
+
+    Wrappers live in their own module, so only builtin and ``typing`` names
+    resolve there; snippet classes, module attributes and string forward
+    references fall back to ``Any``.
+    """
+    def _impl() -> str:
+        import ast
+        try:
+            tree = ast.parse(annotation.strip(), mode="eval")
+        except SyntaxError:
+            return "Any"
+        for node in ast.walk(tree.body):
+            if isinstance(node, ast.Name):
+                if node.id not in WRAPPER_NAMES:
+                    return "Any"
+            elif isinstance(node, ast.Constant):
+                if node.value is not None and node.value is not Ellipsis:
+                    return "Any"
+            elif not isinstance(node, (ast.Subscript, ast.Tuple, ast.List, ast.BinOp, ast.BitOr, ast.Load)):
+                return "Any"
+            elif isinstance(node, ast.BinOp) and not isinstance(node.op, ast.BitOr):
+                return "Any"
+        return ast.unparse(tree.body)
+    return _impl()
+
+
+def input_schema(arg_spec: Sequence[Sequence[str]]) -> Dict[str, Any]:
+    """Return the JSON schema for a tool taking the ``(name, annotation)`` pairs."""
+    def _impl() -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {name: _schema(_parse(ann)) for name, ann in arg_spec},
+            "required": [name for name, _ann in arg_spec],
+            "additionalProperties": False,
+        }
+    return _impl()
+
+
+def compile_validator(arg_spec: Sequence[Sequence[str]]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Compile ``(name, annotation)`` pairs into an argument validator.
+
+    The returned function takes the raw argument dict and returns a new dict of
+    coerced values, or raises :class:`ArgumentError` listing every problem.
+    """
+    def _impl():
+        checks: List[Tuple[str, Callable[[Any], Any]]] = [(name, _checker(_parse(ann))) for name, ann in arg_spec]
+        names = frozenset(name for name, _c in checks)
+
+        def validate(arguments: Dict[str, Any]) -> Dict[str, Any]:
+            out: Dict[str, Any] = {}
+            problems: List[str] = []
+            for name, check in checks:
+                if name not in arguments:
+                    problems.append(f"{name}: missing required argument")
+                    continue
+                try:
+                    out[name] = check(arguments[name])
+                except _Invalid as exc:
+                    problems.append(f"{name}: {exc}, got {arguments[name]!r}")
+            extra = [k for k in arguments if k not in names]
+            if extra:
+                problems.append("unexpected argument(s): " + ", ".join(sorted(extra)))
+            if problems:
+                raise ArgumentError("; ".join(problems))
+            return out
+
+        return validate
+    return _impl()
+
+
+def validated_copy(
+    tool,
+    arg_spec: Sequence[Sequence[str]],
+    schema: Dict[str, Any] | None = None,
+    profiler=None,
+):
+    """
+    Return a validating copy of the FastMCP ``FunctionTool`` ``tool``.
+
+    The copy checks arguments with :func:`compile_validator`, publishes
+    ``schema`` (or one derived from ``arg_spec``) as its input schema, and calls
+    the tool function directly instead of through pydantic.  Calls go through
+    ``profiler`` (an :class:`app.profiling.ToolProfiler`) while it is watching
+    the tool.
+    """
+    def _impl():
+        cls = _tool_classes()["validated"]
+        fields = {name: getattr(tool, name) for name in type(tool).model_fields}
+        fields["parameters"] = schema or input_schema(arg_spec)
+        validated = cls(**fields)
+        validated.validator = compile_validator(arg_spec)
+        validated._profiler = profiler
+        return validated
+    return _impl()
+
+
+def profiled_copy(tool, profiler):
+    """
+    Return a copy of ``tool`` whose calls go through ``profiler`` while it is watching.
+
+    Used for modules without an ``arg_spec`` (written before validators
+    existed): arguments are still checked by pydantic, as FastMCP would.
+    """
+    def _impl():
+        cls = _tool_classes()["profiled"]
+        profiled = cls(**{name: getattr(tool, name) for name in type(tool).model_fields})
+        profiled._profiler = profiler
+        return profiled
+    return _impl()
+
+
+_CLASSES: Dict[str, type] = {}
+
+
+def _tool_classes() -> Dict[str, type]:
+    """Build (once) the FunctionTool subclasses used by the copies above."""
+    if _CLASSES:
+        return _CLASSES
+    import functools
+    import inspect
+    import anyio
+    import pydantic_core
+    from fastmcp.exceptions import ToolError
+    from fastmcp.tools.tool import FunctionTool, ToolResult, _convert_to_content
+    from fastmcp.utilities.types import get_cached_typeadapter
+    from pydantic import PrivateAttr
+
+    class ProfiledTool(FunctionTool):
+        """FunctionTool that reports its calls to a profiler while it is watching."""
+
+        _profiler: Any = PrivateAttr(default=None)
+
+        def _watched(self) -> bool:
+            return self._profiler is not None and self._profiler.watching(self.name)
+
+        def _result(self, result: Any) -> ToolResult:
+            structured = None
+            if self.output_schema is not None:
+                wrap = self.output_schema.get("x-fastmcp-wrap-result")
+                structured = {"result": result} if wrap else result
+            else:
+                try:
+                    structured = pydantic_core.to_jsonable_python(result)
+                except Exception:
+                    structured = None
+                if not isinstance(structured, dict):
+                    structured = None
+            return ToolResult(content=_convert_to_content(result, serializer=self.serializer), structured_content=structured)
+
+        async def run(self, arguments: Dict[str, Any]) -> ToolResult:
+            if inspect.iscoroutinefunction(self.fn) or not self._watched():
+                return await super().run(arguments)
+            adapter = get_cached_typeadapter(self.fn)
+            call = functools.partial(
+                self._profiler.observe, self.name, dict(arguments), lambda **kw: adapter.validate_python(kw)
+            )
+            return self._result(await anyio.to_thread.run_sync(call))
+
+    class ValidatedTool(ProfiledTool):
+        """FunctionTool whose arguments are checked by a precompiled validator."""
+
+        _validator: Any = PrivateAttr(default=None)
+
+        @property
+        def validator(self):
+            return self._validator
+
+        @validator.setter
+        def validator(self, value) -> None:
+            self._validator = value
+
+        async def run(self, arguments: Dict[str, Any]) -> ToolResult:
+            try:
+                args = self._validator(arguments)
+            except ArgumentError as exc:
+                raise ToolError(f"Invalid arguments for {self.name}: {exc}") from exc
+            if inspect.iscoroutinefunction(self.fn):
+                result = await self.fn(**args)
+            else:
+                if self._watched():
+                    call = functools.partial(self._profiler.observe, self.name, args, self.fn)
+                else:
+                    call = functools.partial(self.fn, **args)
+                # Snippet code and fork-server round trips block, so run them
+                # on a worker thread and let other calls proceed meanwhile.
+                result = await anyio.to_thread.run_sync(call)
+            return self._result(result)
+
+    _CLASSES.update(profiled=ProfiledTool, validated=ValidatedTool)
+    return _CLASSES
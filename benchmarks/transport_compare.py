@@ -0,0 +1,116 @@
+"""
+Compare per-session memory and request latency of the MCP transports.
+
+Starts ``run.py`` as a subprocess for each configuration, opens ``--sessions``
+concurrent MCP client sessions to measure the server's resident memory growth
+per session, then times ``--calls`` sequential ``collector.list`` calls on a
+single session.  Results are printed as a Markdown table.
+
+Usage::
+
+    python benchmarks/transport_compare.py --sessions 50 --calls 300
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, List
+
+CONFIGS = [
+    ("sse", "/sse", {"MCP_TRANSPORT": "sse"}),
+    ("streamable-http", "/mcp/", {"MCP_TRANSPORT": "http"}),
+    ("streamable-http (stateless, json)", "/mcp/", {
+        "MCP_TRANSPORT": "http", "MCP_HTTP_STATELESS": "1", "MCP_HTTP_JSON_RESPONSE": "1",
+    }),
+]
+
+
+def _rss_kib(pid: int) -> int:
+    """Return the resident set size of ``pid`` in KiB (Linux only)."""
+    def _impl() -> int:
+        with open(f"/proc/{pid}/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+        return 0
+    return _impl()
+
+
+def _measure(url: str, pid: int, sessions: int, calls: int) -> Dict[str, Any]:
+    """Open ``sessions`` clients against ``url`` and time ``calls`` requests."""
+    def _impl() -> Dict[str, Any]:
+        import asyncio
+        import contextlib
+        import statistics
+        import time
+        from fastmcp import Client
+
+        async def run() -> Dict[str, Any]:
+            # Warm up the server so lazily-initialised state is not billed to sessions.
+            async with Client(url) as warm:
+                await warm.call_tool("collector.list")
+            await asyncio.sleep(0.5)
+            before = _rss_kib(pid)
+            async with contextlib.AsyncExitStack() as stack:
+                clients = [await stack.enter_async_context(Client(url)) for _ in range(sessions)]
+                await asyncio.gather(*(c.call_tool("collector.list") for c in clients))
+                await asyncio.sleep(0.5)
+                after = _rss_kib(pid)
+                timings: List[float] = []
+                for _ in range(calls):
+                    start = time.perf_counter()
+                    await clients[0].call_tool("collector.list")
+                    timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            return {
+                "per_session_kib": (after - before) / sessions,
+                "p50_ms": statistics.median(timings),
+                "p95_ms": timings[int(len(timings) * 0.95) - 1],
+            }
+
+        return asyncio.run(run())
+    return _impl()
+
+
+def main() -> None:
+    def _impl() -> None:
+        import argparse
+        import os
+        import shutil
+        import subprocess
+        import sys
+        import tempfile
+        import time
+
+        parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+        parser.add_argument("--sessions", type=int, default=50)
+        parser.add_argument("--calls", type=int, default=300)
+        parser.add_argument("--port", type=int, default=8790)
+        args = parser.parse_args()
+
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        rows = []
+        for label, path, extra in CONFIGS:
+            reg = tempfile.mkdtemp(prefix="mcpforge-bench-")
+            env = dict(os.environ, PORT=str(args.port), MCPFORGE_REGISTRY_DIR=reg, **extra)
+            proc = subprocess.Popen(
+                [sys.executable, "run.py"], cwd=root, env=env,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                time.sleep(3)
+                res = _measure(f"http://127.0.0.1:{args.port}{path}", proc.pid, args.sessions, args.calls)
+            finally:
+                proc.terminate()
+                proc.wait(timeout=10)
+                shutil.rmtree(reg, ignore_errors=True)
+            rows.append((label, res))
+
+        print(f"| Transport | RSS per session (KiB, {args.sessions} sessions) | p50 latency (ms) | p95 latency (ms) |")
+        print("| --- | --- | --- | --- |")
+        for label, res in rows:
+            print(f"| {label} | {res['per_session_kib']:.0f} | {res['p50_ms']:.2f} | {res['p95_ms']:.2f} |")
+
+    _impl()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,8 +9,35 @@ def main():
         parser = argparse.ArgumentParser(description="Run the MCP Forge tool collector server.")
         parser.add_argument("--host", type=str, default=None, help="Host to bind the server to.")
         parser.add_argument("--port", type=int, default=None, help="Port to bind the server to.")
+        parser.add_argument("--registry-dir", type=str, default=None,
+                            help="Directory for collected tool modules (default ./registry).")
+        parser.add_argument("--registry-backend", type=str, default=None,
+                            choices=["file", "tmpfs", "memory"],
+                            help="Registry storage backend (default file).")
+        parser.add_argument("--headless", action="store_true", default=None,
+                            help="Serve only the MCP transports and /health (no web UI).")
+        parser.add_argument("--export-registry", type=str, default=None, metavar="PATH",
+                            help="Write a snapshot of the registry to PATH and exit.")
+        parser.add_argument("--import-registry", type=str, default=None, metavar="PATH",
+                            help="Import a registry snapshot from PATH before serving.")
+        parser.add_argument("--no-bytecode", action="store_true",
+                            help="Leave precompiled bytecode out of --export-registry snapshots.")
         args = parser.parse_args()
-        _run(host=args.host, port=args.port)
+        if args.export_registry:
+            from app.storage import open_store
+            from app.snapshot import snapshot_store
+            store = open_store(args.registry_backend, args.registry_dir)
+            size = snapshot_store(store, args.export_registry, include_bytecode=not args.no_bytecode)
+            print(f"Wrote {len(store.modules())} modules ({size} bytes) to {args.export_registry}")
+            return
+        _run(
+            host=args.host,
+            port=args.port,
+            registry_dir=args.registry_dir,
+            registry_backend=args.registry_backend,
+            headless=args.headless,
+            snapshot=args.import_registry,
+        )
     return _impl()
 
 if __name__ == "__main__":
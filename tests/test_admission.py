@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+import httpx
+from fastmcp import Client
+
+from app.admission import TokenBucket, KeyedRateLimiter, IngestGate, Overloaded
+
+TEST_HOST = "127.0.0.1"
+TEST_PORT = 8765
+BASE_URL = f"http://{TEST_HOST}:{TEST_PORT}"
+
+
+def test_token_bucket_refuses_when_empty():
+    """A drained bucket reports how long to wait for the next token."""
+    bucket = TokenBucket(rate=1.0, burst=2)
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 0.0
+    wait = bucket.try_acquire()
+    assert 0.0 < wait <= 1.0
+
+
+def test_keyed_limiter_overrides_and_unlimited_default():
+    """Per-key overrides apply while other keys stay unlimited."""
+    limiter = KeyedRateLimiter(0, 0, overrides={"heavy": (0.001, 1)})
+    assert all(limiter.try_acquire("light") == 0.0 for _ in range(100))
+    assert limiter.try_acquire("heavy") == 0.0
+    assert limiter.try_acquire("heavy") > 0.0
+
+
+def test_ingest_gate_rejects_when_queue_full():
+    """Only ``concurrency + queue`` ingests may be pending at once."""
+    gate = IngestGate(concurrency=1, queue=1)
+    release = threading.Event()
+    entered = threading.Event()
+
+    def hold():
+        with gate.admit():
+            entered.set()
+            release.wait(5)
+
+    worker = threading.Thread(target=hold)
+    worker.start()
+    entered.wait(5)
+    waiting = gate.admit()  # reserves the single queue slot
+    with pytest.raises(Overloaded):
+        gate.admit()
+    release.set()
+    worker.join()
+    with waiting:
+        pass
+    assert gate.pending == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("server", [{"MCPFORGE_TOOL_LIMITS": "collector.list=0.001:2"}], indirect=True)
+async def test_tool_rate_limit_over_mcp(server):
+    """Calls beyond a tool's burst are rejected instead of queued."""
+    from fastmcp.exceptions import ToolError
+
+    async with Client(f"{BASE_URL}/sse") as client:
+        await client.call_tool("collector.list")
+        await client.call_tool("collector.list")
+        with pytest.raises(ToolError, match="rate limit"):
+            await client.call_tool("collector.list")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "server", [{"USE_MOCK_LLM": "1", "MCPFORGE_TOOL_LIMITS": "collector.ingest_python=0.001:1"}], indirect=True
+)
+async def test_ingest_rate_limit_over_http(server):
+    """The REST ingest endpoint answers 429 with a Retry-After header."""
+    code = "def add(a: int, b: int) -> int:\n    return a + b\n"
+    async with httpx.AsyncClient() as client:
+        resp = await client.post(f"{BASE_URL}/tools", json={"snippet_name": "one", "code": code})
+        assert resp.status_code == 201
+        resp = await client.post(f"{BASE_URL}/tools", json={"snippet_name": "two", "code": code})
+        assert resp.status_code == 429
+        assert int(resp.headers["retry-after"]) >= 1
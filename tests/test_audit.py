@@ -0,0 +1,171 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import httpx
+import pytest
+from fastmcp import Client
+
+from app.audit import AuditLog, JsonlSink, SqliteSink, open_sink
+
+TEST_HOST = "127.0.0.1"
+TEST_PORT = 8765
+BASE_URL = f"http://{TEST_HOST}:{TEST_PORT}"
+AUDIT_PATH = f"/tmp/mcpforge-audit-{os.getpid()}.jsonl"
+
+SNIPPET = (
+    "def share(total: int, parts: int) -> float:\n"
+    "    \"\"\"Split a total into equal parts.\"\"\"\n"
+    "    return total / parts\n"
+)
+
+
+def test_jsonl_log_batches_rotates_and_aggregates(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    log = AuditLog(JsonlSink(path, max_bytes=2000, backups=2), batch_size=10, flush_interval=0.05)
+    for i in range(40):
+        log.record("call", "double" if i % 4 else "slow", "10.0.0.1", float(i), 12, 3,
+                   "ok" if i % 10 else "error", None if i % 10 else "ValueError: bad")
+    log.close()
+
+    files = [path, f"{path}.1", f"{path}.2"]
+    assert not os.path.exists(f"{path}.3")
+    lines = [json.loads(line) for f in files if os.path.exists(f) for line in open(f)]
+    assert 0 < len(lines) <= 40 and all(r["caller"] == "10.0.0.1" for r in lines)
+
+    report = log.aggregates()
+    assert report["log"]["written"] == 40 and report["log"]["dropped"] == 0
+    rows = {r["tool"]: r for r in report["tools"]}
+    assert rows["double"]["calls"] == 30 and rows["slow"]["calls"] == 10
+    assert rows["slow"]["errors"] == 2 and rows["double"]["errors"] == 2
+    assert rows["slow"]["max_ms"] == 36.0 and rows["double"]["in_bytes"] == 360
+
+
+def test_sqlite_sink_and_format_selection(tmp_path):
+    assert open_sink(None) is None
+    assert isinstance(open_sink(str(tmp_path / "a.jsonl")), JsonlSink)
+    assert isinstance(open_sink(str(tmp_path / "a.log"), "sqlite"), SqliteSink)
+    with pytest.raises(ValueError):
+        open_sink(str(tmp_path / "a.log"), "csv")
+
+    path = str(tmp_path / "audit.db")
+    log = AuditLog(open_sink(path), flush_interval=0.05)
+    for i in range(5):
+        log.record("ingest", "snippet", None, 1.5, 100, 1)
+    log.close()
+    rows = sqlite3.connect(path).execute("SELECT kind, tool, in_bytes, outcome FROM audit").fetchall()
+    assert rows == [("ingest", "snippet", 100, "ok")] * 5
+
+
+class _SlowSink:
+    def __init__(self):
+        self.release = threading.Event()
+        self.records = []
+
+    def write(self, records):
+        self.release.wait(5)
+        self.records.extend(records)
+
+    def close(self):
+        pass
+
+
+def test_drop_and_block_policies_under_pressure():
+    sink = _SlowSink()
+    log = AuditLog(sink, buffer_size=4, batch_size=1, flush_interval=0.01, policy="drop")
+    time.sleep(0.05)
+    accepted = [log.record("call", "t") for _ in range(20)]
+    assert accepted.count(False) >= 15 and log.aggregates()["log"]["dropped"] == accepted.count(False)
+    sink.release.set()
+    log.close()
+    assert len(sink.records) == accepted.count(True)
+
+    sink = _SlowSink()
+    log = AuditLog(sink, buffer_size=2, batch_size=1, flush_interval=0.01, policy="block", block_timeout=2)
+    threading.Timer(0.2, sink.release.set).start()
+    started = time.monotonic()
+    assert all(log.record("call", "t") for _ in range(6))
+    assert time.monotonic() - started >= 0.15
+    log.close()
+    assert len(sink.records) == 6
+
+    with pytest.raises(ValueError):
+        AuditLog(policy="spill")
+
+
+@pytest.mark.asyncio
+async def test_block_policy_waits_off_the_event_loop():
+    """A full queue under ``block`` must not stall other coroutines."""
+    import asyncio
+    sink = _SlowSink()
+    log = AuditLog(sink, buffer_size=1, batch_size=1, flush_interval=0.01, policy="block", block_timeout=0.5)
+    ticks = []
+
+    async def _tick():
+        for _ in range(10):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.02)
+
+    started = time.monotonic()
+    await asyncio.gather(_tick(), *(log.arecord("call", "t") for _ in range(4)))
+    assert time.monotonic() - started >= 0.4  # the records did wait for room
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.2
+    sink.release.set()
+    log.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "server",
+    [{"USE_MOCK_LLM": "1", "MCPFORGE_CURATION": "local", "MCPFORGE_AUDIT_LOG": AUDIT_PATH,
+      "MCPFORGE_AUDIT_FLUSH_INTERVAL": "0.1"}],
+    indirect=True,
+)
+async def test_calls_and_ingests_are_audited(server):
+    try:
+        async with Client(f"{BASE_URL}/sse") as client:
+            await client.call_tool("collector.ingest_python", {"snippet_name": "nums", "code": SNIPPET})
+            for parts in range(1, 4):
+                await client.call_tool("share", {"total": 12, "parts": parts})
+            with pytest.raises(Exception):
+                await client.call_tool("share", {"total": 12, "parts": 0})
+            job = (await client.call_tool(
+                "collector.ingest_python_async", {"snippet_name": "later", "code": SNIPPET.replace("share", "split")}
+            )).data
+            for _ in range(50):
+                status = (await client.call_tool("collector.job_status", {"job_id": job["job_id"]})).data
+                if status["status"] not in ("queued", "running"):
+                    break
+                time.sleep(0.1)
+            assert status["status"] == "succeeded"
+
+        async with httpx.AsyncClient() as http:
+            assert (await http.post(f"{BASE_URL}/tools/nums_1/test")).status_code == 200
+            resp = await http.post(
+                f"{BASE_URL}/tools/batch", json={"tool_name": "share", "items": [{"total": 4, "parts": 2}]}
+            )
+            assert resp.status_code == 200
+            time.sleep(0.5)
+            report = (await http.get(f"{BASE_URL}/admin/audit", params={"window": 300})).json()
+            assert report["window_seconds"] == 300
+
+        rows = {(r["kind"], r["tool"]): r for r in report["tools"]}
+        share = rows[("call", "share")]
+        assert share["calls"] == 5 and share["errors"] == 1 and share["sources"] == {"mcp": 4, "rest": 1}
+        assert rows[("ingest", "nums")]["sources"] == {"sync": 1}
+        assert rows[("ingest", "later")]["calls"] == 1 and rows[("ingest", "later")]["sources"] == {"job": 1}
+        assert rows[("batch", "share")]["sources"] == {"rest": 1} and rows[("batch", "share")]["errors"] == 0
+        assert rows[("call", "collector.ingest_python")]["out_bytes"] > 0
+        assert report["log"]["sink"] == AUDIT_PATH
+
+        records = [json.loads(line) for line in open(AUDIT_PATH)]
+        assert {r["kind"] for r in records} == {"call", "ingest", "batch"}
+        assert all(
+            set(r) >= {"tool", "caller", "duration_ms", "in_bytes", "out_bytes", "outcome", "source"} for r in records
+        )
+        assert next(r for r in records if r["source"] == "rest")["caller"] == "127.0.0.1"
+    finally:
+        if os.path.exists(AUDIT_PATH):
+            os.remove(AUDIT_PATH)
@@ -0,0 +1,56 @@
+import pytest
+import httpx
+from fastmcp import Client
+
+from app.batch import run_batch
+
+TEST_HOST = "127.0.0.1"
+TEST_PORT = 8765
+BASE_URL = f"http://{TEST_HOST}:{TEST_PORT}"
+
+DIV_SNIPPET = "def divide(a: int, b: int) -> float:\n    return a / b\n"
+
+
+@pytest.mark.parametrize("max_parallel", [1, 4])
+def test_run_batch_keeps_order_and_isolates_errors(max_parallel):
+    """Results follow input order and a failing item does not affect others."""
+    items = [{"x": i} for i in range(20)] + [{"y": 1}, "bad"]
+    results = run_batch(lambda args: args["x"] * 2, items, max_parallel)
+    assert [r["result"] for r in results[:20]] == [i * 2 for i in range(20)]
+    assert results[20] == {"ok": False, "error": "KeyError: 'x'"}
+    assert results[21]["ok"] is False
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("server", [{"USE_MOCK_LLM": "1"}], indirect=True)
+async def test_call_batch_over_mcp_and_http(server):
+    """A collected tool can be applied to many argument sets in one request."""
+    items = [{"a": 6, "b": 3}, {"a": 1, "b": 0}, {"a": 9, "b": 2}]
+    async with Client(f"{BASE_URL}/sse") as client:
+        await client.call_tool("collector.ingest_python", {"snippet_name": "div", "code": DIV_SNIPPET})
+        response = await client.call_tool(
+            "collector.call_batch", {"tool_name": "divide", "items": items, "max_parallel": 2}
+        )
+        results = response.data["results"]
+        assert [r["ok"] for r in results] == [True, False, True]
+        assert results[0]["result"] == "2.0" and results[2]["result"] == "4.5"
+        assert results[1]["error"].startswith("ZeroDivisionError")
+        assert response.data["failed"] == 1
+        # A non-object item fails alone instead of rejecting the whole call
+        response = await client.call_tool("collector.call_batch", {"tool_name": "divide", "items": [items[0], 7]})
+        assert [r["ok"] for r in response.data["results"]] == [True, False]
+
+    async with httpx.AsyncClient() as http:
+        resp = await http.post(f"{BASE_URL}/tools/batch", json={"tool_name": "divide", "items": items})
+        assert resp.status_code == 200
+        assert [r.get("result") for r in resp.json()["results"]] == ["2.0", None, "4.5"]
+        resp = await http.post(f"{BASE_URL}/tools/batch", json={"tool_name": "missing", "items": []})
+        assert resp.status_code == 404
+        for bad in ("abc", None, [2]):
+            resp = await http.post(
+                f"{BASE_URL}/tools/batch", json={"tool_name": "divide", "items": items, "max_parallel": bad}
+            )
+            assert resp.status_code == 400
+        for body in (b"[1,2]", b"{not json", b"\"divide\""):
+            resp = await http.post(f"{BASE_URL}/tools/batch", content=body, headers={"content-type": "application/json"})
+            assert resp.status_code == 400
@@ -0,0 +1,145 @@
+import pytest
+from fastmcp import Client
+
+from app.curation import curate_locally, analyze_snippet
+from app.server import _parse_functions
+
+TEST_HOST = "127.0.0.1"
+TEST_PORT = 8765
+
+
+def _curate(code):
+    return curate_locally(code, _parse_functions(code))
+
+
+def test_pure_function_is_curated_locally():
+    """Trivial typed functions get names, descriptions and examples without the LLM."""
+    chosen, report = _curate('def double(x: int) -> int:\n    """Double a number."""\n    return x * 2\n')
+    assert report["double"]["verdict"] == "safe"
+    assert chosen == [{
+        "original_name": "double",
+        "tool_name": "double",
+        "description": "Double a number.",
+        "example_params": {"x": 1},
+    }]
+
+
+def test_type_driven_examples_and_defaults():
+    """Examples follow annotations, and literal defaults win over synthetic values."""
+    code = (
+        "import json\n"
+        "from typing import List, Optional\n"
+        "def fmt(items: List[str], flag: bool, scale: float, label: Optional[str] = None, indent: int = 4) -> str:\n"
+        "    return json.dumps(items, indent=indent)\n"
+    )
+    chosen, _ = _curate(code)
+    assert chosen[0]["example_params"] == {
+        "items": ["example", "example"], "flag": True, "scale": 3.5, "label": "example", "indent": 4,
+    }
+
+
+@pytest.mark.parametrize("code, reason", [
+    ("import os\ndef rm(p: str) -> None:\n    os.remove(p)\n", "imports os"),
+    ("def read(p: str) -> str:\n    return open(p).read()\n", "calls open()"),
+    ("def esc(x: int) -> object:\n    return x.__class__.__subclasses__()\n", "touches __subclasses__"),
+    ("def esc(p: str) -> str:\n    return print.__self__.open(p).read()\n", "touches __self__"),
+    ("def esc(cmd: str) -> int:\n    return __loader__.load_module('os').system(cmd)\n", "touches __loader__"),
+    ("def esc(p: str) -> str:\n    reader = open\n    return reader(p).read()\n", "uses open"),
+    # String-based attribute lookups
+    ("import operator\ndef esc(f: int) -> int:\n"
+     "    return operator.attrgetter('__globals__')(f)['__builtins__']['__import__']('os').getpid()\n",
+     "mentions __globals__ in a string"),
+    ("from operator import attrgetter\ndef esc(f: int) -> int:\n    return attrgetter('__glo' + 'bals__')(f)\n",
+     "uses attrgetter"),
+    ("import typing\ndef esc(x: int) -> dict:\n    def g(a: \"__import__('os').getpid()\"):\n        pass\n"
+     "    return typing.get_type_hints(g)\n", "uses get_type_hints"),
+    ("def esc(x: int) -> str:\n    return '{0.__class__}'.format(x)\n", "mentions __class__ in a string"),
+])
+def test_unsafe_functions_are_rejected(code, reason):
+    chosen, report = _curate(code)
+    assert chosen == []
+    (info,) = report.values()
+    assert info["verdict"] == "unsafe" and reason in info["reasons"]
+
+
+@pytest.mark.parametrize("code", [
+    "def f(x):\n    return x\n",
+    "import numpy as np\ndef f(x: int) -> int:\n    return int(np.sum([x]))\n",
+    "COUNT = 0\ndef f(x: int) -> int:\n    global COUNT\n    COUNT += x\n    return COUNT\n",
+    "print('loading')\ndef f(x: int) -> int:\n    return x\n",
+    "def f(x: int) -> int:\n    return helper(x)\n",
+    # ``import os`` stripped by the ingest pipeline leaves a free name
+    "def f(p: str) -> None:\n    return os.remove(p)\n",
+    "def f(x: int) -> int:\n    return x + OFFSET\n",
+    "def f(x: int) -> int:\n    return registry.lookup(x)\n",
+    "def f(x: int) -> str:\n    return ('{0.__cl' + 'ass__}').format(x)\n",
+])
+def test_uncertain_functions_defer_to_llm(code):
+    chosen, report = _curate(code)
+    assert chosen is None
+    assert report["f"]["verdict"] == "unsure"
+
+
+def test_locals_and_constant_tables_stay_safe():
+    """Names bound in the snippet itself do not make a function unsure."""
+    code = (
+        "SCALE = {'k': 1000}\n"
+        "def convert(x: int, unit: str) -> int:\n"
+        "    parts = [y for y in range(x) if (z := y)]\n"
+        "    total = sum(parts)\n"
+        "    return total * SCALE.get(unit, 1) + ', '.join(map(str, parts)).count(',')\n"
+    )
+    chosen, report = _curate(code)
+    assert report["convert"] == {"verdict": "safe", "reasons": []}
+    assert [c["tool_name"] for c in chosen] == ["convert"]
+
+
+def test_helpers_propagate_their_verdict():
+    """Private helpers are not exposed, but callers inherit their verdict."""
+    code = (
+        "def _load(p: str) -> str:\n    return open(p).read()\n"
+        "def size(p: str) -> int:\n    return len(_load(p))\n"
+        "def square(x: int) -> int:\n    return x * x\n"
+    )
+    chosen, report = _curate(code)
+    assert [c["tool_name"] for c in chosen] == ["square"]
+    assert report["size"]["verdict"] == "unsafe"
+
+
+@pytest.mark.asyncio
+async def test_ingest_reports_local_path_without_llm(server):
+    """With no API key and no mock, safe snippets are still curated and registered."""
+    async with Client(f"http://{TEST_HOST}:{TEST_PORT}/sse") as client:
+        response = await client.call_tool(
+            "collector.ingest_python",
+            {"snippet_name": "math utils", "code": "def double(x: int) -> int:\n    return x * 2"},
+        )
+        assert response.data["created"] == ["math_utils_1"]
+        assert response.data["curation"]["path"] == "local"
+        assert response.data["curation"]["functions"]["double"]["verdict"] == "safe"
+        result = await client.call_tool("double", {"x": 21})
+        assert int(result.content[0].text) == 42
+
+
+@pytest.mark.parametrize("llm_env", [{}, {"USE_MOCK_LLM": "1", "MOCK_LLM_FUNCTION": "wipe"}])
+def test_unsafe_functions_are_never_registered(monkeypatch, llm_env):
+    """Neither the no-LLM fallback nor an LLM choice registers a function marked unsafe."""
+    from app.server import build_server
+
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("USE_MOCK_LLM", raising=False)
+    monkeypatch.setenv("MCPFORGE_CURATION", "auto")
+    for name, value in llm_env.items():
+        monkeypatch.setenv(name, value)
+    mcp = build_server(registry_backend="memory")
+    code = (
+        "def wipe(p: str) -> str:\n    return open(p).read()\n"
+        "def helper(x):\n    return x\n"
+    )
+    result = mcp.ingest_snippet("danger", code)
+    assert result["curation"]["functions"]["wipe"]["verdict"] == "unsafe"
+    assert "wipe" not in mcp.module_tool_map.values()
+    assert [mcp.module_tool_map[m] for m in result["created"]] == ["helper"]
+
+    only_unsafe = mcp.ingest_snippet("worse", "def wipe(p: str) -> str:\n    return open(p).read()\n")
+    assert only_unsafe["created"] == [] and "wipe" not in mcp.module_tool_map.values()
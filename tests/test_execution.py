@@ -0,0 +1,97 @@
+import os
+
+import pytest
+from fastmcp import Client
+
+from app.execution import ForkServerRunner, preload_modules
+
+TEST_HOST = "127.0.0.1"
+TEST_PORT = 8765
+BASE_URL = f"http://{TEST_HOST}:{TEST_PORT}"
+
+PROBE_SNIPPET = (
+    "import os\n"
+    "import sys\n"
+    "def probe(a: int):\n"
+    "    return (a * 2, os.getpid(), 'xml.dom.minidom' in sys.modules)\n"
+)
+ADD_SNIPPET = "def add(a: int, b: int) -> int:\n    return a + b\n"
+
+
+@pytest.fixture
+def runner():
+    runner = ForkServerRunner(preload=["xml.dom.minidom"], workers=2)
+    yield runner
+    runner.close()
+
+
+def test_fork_server_runs_preloaded_snippets_out_of_process(runner):
+    """Calls run in forked workers that inherit the template's preloaded modules."""
+    runner.load([PROBE_SNIPPET])
+    value, pid, preloaded = runner.call(PROBE_SNIPPET, "probe", {"a": 3})
+    assert value == 6
+    assert pid != os.getpid()
+    assert preloaded
+
+
+def test_fork_server_reports_snippet_errors(runner):
+    """Exceptions raised by a snippet reach the caller with their original type."""
+    with pytest.raises(ZeroDivisionError):
+        runner.call("def boom():\n    return 1 / 0\n", "boom", {})
+    with pytest.raises(ValueError):
+        runner.call(ADD_SNIPPET, "missing", {})
+    # Unknown sources are loaded on demand.
+    assert runner.call(ADD_SNIPPET, "add", {"a": 1, "b": 2}) == 3
+
+
+def test_preload_modules_from_env(monkeypatch):
+    monkeypatch.setenv("MCPFORGE_FORKSERVER_PRELOAD", "xml.dom, json")
+    modules = preload_modules()
+    assert "xml.dom" in modules and modules.count("json") == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "server", [{"USE_MOCK_LLM": "1", "MCPFORGE_EXECUTION": "forkserver"}], indirect=True
+)
+async def test_tools_run_in_fork_server(server):
+    """With MCPFORGE_EXECUTION=forkserver collected tools and batches still work."""
+    async with Client(f"{BASE_URL}/sse") as client:
+        await client.call_tool("collector.ingest_python", {"snippet_name": "add", "code": ADD_SNIPPET})
+        response = await client.call_tool("add", {"a": 1, "b": 2})
+        assert response.content[0].text == "3"
+        response = await client.call_tool(
+            "collector.call_batch", {"tool_name": "add", "items": [{"a": 1, "b": 1}, {"a": 2}]}
+        )
+        results = response.data["results"]
+        assert results[0] == {"ok": True, "result": "2"}
+        assert results[1]["error"].startswith("ArgumentError")
+
+
+SLOW_SNIPPET = (
+    "def nap(seconds: float) -> float:\n"
+    "    import time\n"
+    "    time.sleep(seconds)\n"
+    "    return seconds\n"
+)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "server",
+    [{"USE_MOCK_LLM": "1", "MCPFORGE_EXECUTION": "forkserver", "MCPFORGE_FORKSERVER_WORKERS": "2"}],
+    indirect=True,
+)
+async def test_slow_fork_server_calls_run_concurrently(server):
+    """A tool call waiting on a worker does not stall the event loop for other calls."""
+    import asyncio
+    import time
+
+    async with Client(f"{BASE_URL}/sse") as client:
+        await client.call_tool("collector.ingest_python", {"snippet_name": "nap", "code": SLOW_SNIPPET})
+        await client.call_tool("nap", {"seconds": 0.01})  # warm up the workers
+        started = time.perf_counter()
+        results = await asyncio.gather(*[client.call_tool("nap", {"seconds": 1.0}) for _ in range(2)])
+        elapsed = time.perf_counter() - started
+    assert [r.content[0].text for r in results] == ["1.0", "1.0"]
+    assert elapsed < 1.8
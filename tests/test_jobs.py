@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+import pytest
+import httpx
+from fastmcp import Client
+
+from app.jobs import JobQueue
+
+TEST_HOST = "127.0.0.1"
+TEST_PORT = 8765
+BASE_URL = f"http://{TEST_HOST}:{TEST_PORT}"
+
+ADD_SNIPPET = "def add(a: int, b: int) -> int:\n    return a + b\n"
+
+
+def _wait(queue: JobQueue, job_id: str) -> dict:
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_job_queue_reports_result_and_error():
+    """Jobs record their return value or the exception that stopped them."""
+    queue = JobQueue(workers=1)
+    ok = _wait(queue, queue.submit("demo", lambda: {"value": 1}))
+    assert ok["status"] == "succeeded" and ok["result"] == {"value": 1}
+    bad = _wait(queue, queue.submit("demo", lambda: 1 / 0))
+    assert bad["status"] == "failed" and "ZeroDivisionError" in bad["error"]
+    assert queue.get("missing") is None
+    queue.shutdown()
+
+
+def test_job_queue_prunes_old_finished_jobs():
+    """Only the most recent finished jobs are retained."""
+    queue = JobQueue(workers=1, max_finished=2)
+    ids = [queue.submit("demo", lambda: None) for _ in range(4)]
+    queue.shutdown()
+    assert [queue.get(i) is not None for i in ids] == [False, False, True, True]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("server", [{"USE_MOCK_LLM": "1"}], indirect=True)
+async def test_async_ingest_over_mcp(server):
+    """An async ingest returns a job ID immediately and the tool appears once done."""
+    async with Client(f"{BASE_URL}/sse") as client:
+        response = await client.call_tool(
+            "collector.ingest_python_async", {"snippet_name": "bg", "code": ADD_SNIPPET}
+        )
+        job_id = response.data["job_id"]
+        for _ in range(50):
+            status = (await client.call_tool("collector.job_status", {"job_id": job_id})).data
+            if status["status"] not in ("queued", "running"):
+                break
+            await asyncio.sleep(0.1)
+        assert status["status"] == "succeeded"
+        assert status["result"]["created"] == ["bg_1"]
+        result = await client.call_tool("add", {"a": 2, "b": 2})
+        assert int(result.content[0].text) == 4
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("server", [{"USE_MOCK_LLM": "1"}], indirect=True)
+async def test_async_ingest_over_http(server):
+    """``POST /jobs`` answers 202 and ``GET /jobs/{id}`` reports completion."""
+    async with httpx.AsyncClient() as client:
+        resp = await client.post(f"{BASE_URL}/jobs", json={"snippet_name": "bg", "code": ADD_SNIPPET})
+        assert resp.status_code == 202
+        status_url = resp.json()["status_url"]
+        for _ in range(50):
+            job = (await client.get(f"{BASE_URL}{status_url}")).json()
+            if job["status"] not in ("queued", "running"):
+                break
+            await asyncio.sleep(0.1)
+        assert job["status"] == "succeeded"
+        assert (await client.get(f"{BASE_URL}/tools")).json() == ["bg_1"]
+
+        resp = await client.get(f"{BASE_URL}/jobs/unknown")
+        assert resp.status_code == 404
+
+        # htmx polling receives an HTML fragment and a trigger once finished
+        resp = await client.get(f"{BASE_URL}{status_url}", headers={"HX-Request": "true"})
+        assert resp.headers.get("hx-trigger") == "toolAdded"
+        assert "Created bg_1" in resp.text
@@ -0,0 +1,116 @@
+import marshal
+import pstats
+
+import httpx
+import pytest
+from fastmcp import Client
+
+from app.profiling import ToolProfiler, args_digest
+
+TEST_HOST = "127.0.0.1"
+TEST_PORT = 8765
+BASE_URL = f"http://{TEST_HOST}:{TEST_PORT}"
+
+SNIPPET = (
+    "def slow_sum(n: int) -> int:\n"
+    "    \"\"\"Add up the numbers below n the long way.\"\"\"\n"
+    "    total = 0\n"
+    "    for i in range(n):\n"
+    "        total += i\n"
+    "    return total\n"
+)
+
+
+def _work(n: int) -> int:
+    return sum(range(n))
+
+
+def test_profiler_times_samples_and_keeps_slowest(tmp_path):
+    profiler = ToolProfiler(slow_calls=3)
+    assert not profiler.watching("work")
+    assert profiler.report("work") is None and profiler.dump("work") is None
+
+    profiler.enable("work", sample_rate=1.0)
+    for n in (10, 200000, 20, 100000, 30):
+        assert profiler.observe("work", {"n": n}, _work) == sum(range(n))
+    with pytest.raises(ZeroDivisionError):
+        profiler.observe("work", {"n": 0}, lambda n: 1 / n)
+
+    report = profiler.report("work")
+    assert report["enabled"] is True
+    assert report["calls"] == 6 and report["sampled"] == 6
+    slowest = report["slowest"]
+    assert len(slowest) == 3
+    assert slowest[0]["args_digest"] == args_digest({"n": 200000})
+    assert [s["duration_ms"] for s in slowest] == sorted((s["duration_ms"] for s in slowest), reverse=True)
+    assert "_work" in report["profile"]
+
+    path = tmp_path / "work.pstats"
+    path.write_bytes(profiler.dump("work"))
+    stats = pstats.Stats(str(path))
+    assert any(func[2] == "_work" for func in stats.stats)
+    assert marshal.loads(profiler.dump("work")) == stats.stats
+
+    profiler.disable("work")
+    assert not profiler.watching("work") and profiler.report("work")["enabled"] is False
+    profiler.enable("work", sample_rate=0.0, reset=True)
+    profiler.observe("work", {"n": 5}, _work)
+    report = profiler.report("work")
+    assert report["calls"] == 1 and report["sampled"] == 0 and report["profile"] == ""
+
+
+@pytest.mark.asyncio
+async def test_modules_without_arg_spec_are_profiled(tmp_path):
+    """Modules written before validators existed are profiled too."""
+    from app.registry import write_tool_module
+    from app.server import build_server
+    from app.storage import FileRegistryStore
+
+    store = FileRegistryStore(str(tmp_path))
+    write_tool_module(store, "legacy", SNIPPET, "slow_sum", "slow_sum", "Sum", [("n", "int")], {"n": 10})
+    meta = store.read_meta("legacy")
+    del meta["arg_spec"]
+    store.write("legacy", store.read_source("legacy"), meta)
+
+    mcp = build_server(registry_dir=str(tmp_path))
+    async with Client(mcp) as client:
+        await client.call_tool("collector.profile", {"tool_name": "slow_sum", "sample_rate": 1.0})
+        for n in (100, 5000):
+            assert (await client.call_tool("slow_sum", {"n": n})).content[0].text == str(sum(range(n)))
+    report = mcp.profiler.report("slow_sum")
+    assert report["calls"] == 2 and report["sampled"] == 2
+    assert any(func[2] == "slow_sum" for func in marshal.loads(mcp.profiler.dump("slow_sum")))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("server", [{"USE_MOCK_LLM": "1", "MCPFORGE_CURATION": "local"}], indirect=True)
+async def test_profile_toggle_over_mcp_and_download(server, tmp_path):
+    async with Client(f"{BASE_URL}/sse") as client:
+        await client.call_tool("collector.ingest_python", {"snippet_name": "sums", "code": SNIPPET})
+        await client.call_tool("slow_sum", {"n": 1000})
+        with pytest.raises(Exception):
+            await client.call_tool("collector.profile_report", {"tool_name": "slow_sum"})
+
+        status = (await client.call_tool("collector.profile", {"tool_name": "slow_sum", "sample_rate": 1.0})).data
+        assert status["profiling"] == {"slow_sum": 1.0}
+        for n in (10, 50000, 100):
+            await client.call_tool("slow_sum", {"n": n})
+        report = (await client.call_tool("collector.profile_report", {"tool_name": "slow_sum"})).data
+        assert report["calls"] == 3 and report["sampled"] == 3
+        assert report["slowest"][0]["args_digest"] == args_digest({"n": 50000})
+
+        await client.call_tool("collector.profile", {"tool_name": "slow_sum", "enabled": False})
+        await client.call_tool("slow_sum", {"n": 10})
+        with pytest.raises(Exception):
+            await client.call_tool("collector.profile", {"tool_name": "no_such_tool"})
+
+    async with httpx.AsyncClient() as http:
+        assert (await http.get(f"{BASE_URL}/admin/profiles")).json() == {}
+        report = (await http.get(f"{BASE_URL}/admin/profiles/slow_sum")).json()
+        assert report["calls"] == 3 and report["enabled"] is False
+        resp = await http.get(f"{BASE_URL}/admin/profiles/slow_sum/pstats")
+        assert resp.status_code == 200
+        path = tmp_path / "slow_sum.pstats"
+        path.write_bytes(resp.content)
+        assert any(func[2] == "slow_sum" for func in pstats.Stats(str(path)).stats)
+        assert (await http.get(f"{BASE_URL}/admin/profiles/other/pstats")).status_code == 404
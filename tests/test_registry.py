@@ -0,0 +1,71 @@
+import os
+
+import pytest
+import httpx
+
+from app.registry import write_tool_module, load_all_registered, load_example_params, delete_tool_module
+from app.storage import open_store, MemoryRegistryStore, FileRegistryStore, RegistryStore, TmpfsRegistryStore
+
+TEST_HOST = "127.0.0.1"
+TEST_PORT = 8765
+BASE_URL = f"http://{TEST_HOST}:{TEST_PORT}"
+
+ADD_SNIPPET = "def add(a: int, b: int) -> int:\n    return a + b\n"
+
+
+@pytest.mark.parametrize("backend", ["memory", "file", "tmpfs"])
+def test_store_round_trip(backend, tmp_path):
+    """Modules written to any backend can be loaded, listed and deleted."""
+    from fastmcp import FastMCP
+
+    store = open_store(backend, None if backend == "memory" else str(tmp_path / "reg"))
+    write_tool_module(store, "math_1", ADD_SNIPPET, "add", "add", "Add numbers", [("a", "int"), ("b", "int")], {"a": 1, "b": 2})
+    assert store.modules() == ["math_1"]
+    assert load_example_params(store) == {"math_1": {"a": 1, "b": 2}}
+
+    mcp = FastMCP("test")
+    assert load_all_registered(mcp, store) == {"math_1": "add"}
+
+    assert delete_tool_module(store, "math_1") is True
+    assert store.modules() == []
+    assert delete_tool_module(store, "math_1") is False
+
+
+def test_open_store_selection(tmp_path, monkeypatch):
+    """Backends are selected from arguments first, then the environment."""
+    monkeypatch.setenv("MCPFORGE_REGISTRY_BACKEND", "memory")
+    assert isinstance(open_store(), MemoryRegistryStore)
+    store = open_store("file", str(tmp_path))
+    assert isinstance(store, FileRegistryStore) and store.location == str(tmp_path)
+    assert not store.durable
+    monkeypatch.setenv("MCPFORGE_REGISTRY_FSYNC", "1")
+    assert open_store("file", str(tmp_path)).durable
+    assert isinstance(open_store("tmpfs", str(tmp_path)), TmpfsRegistryStore)
+    with pytest.raises(ValueError):
+        open_store("bogus")
+    with pytest.raises(TypeError):
+        RegistryStore()
+
+
+def test_directory_paths_still_accepted(tmp_path):
+    """Registry helpers keep accepting plain directory paths."""
+    path = write_tool_module(str(tmp_path), "m_1", ADD_SNIPPET, "add", "add", "Add", [("a", "int"), ("b", "int")])
+    assert os.path.exists(path)
+    assert os.path.exists(tmp_path / "m_1.json")
+    assert load_example_params(str(tmp_path)) == {"m_1": {}}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("server", [{"USE_MOCK_LLM": "1", "MCPFORGE_REGISTRY_BACKEND": "memory"}], indirect=True)
+async def test_memory_backend_avoids_disk(server):
+    """With the memory backend, ingest registers tools without touching ./registry."""
+    async with httpx.AsyncClient() as client:
+        resp = await client.post(f"{BASE_URL}/tools", json={"snippet_name": "mem", "code": ADD_SNIPPET})
+        assert resp.status_code == 201
+        module_name = resp.json()["created"][0]
+
+        resp = await client.post(f"{BASE_URL}/tools/{module_name}/test")
+        assert resp.status_code == 200
+        assert int(resp.json()["output"]["result"]) == 3
+
+    assert os.listdir("registry") == []
@@ -0,0 +1,78 @@
+import time
+
+import httpx
+import pytest
+from fastmcp import Client
+
+from app.search import SearchIndex, tokenize
+
+TEST_HOST = "127.0.0.1"
+TEST_PORT = 8765
+BASE_URL = f"http://{TEST_HOST}:{TEST_PORT}"
+
+SNIPPET = (
+    "def parse_iso_date(text: str) -> str:\n"
+    "    \"\"\"Normalise an ISO-8601 timestamp to a calendar day.\"\"\"\n"
+    "    return text[:10]\n"
+    "\n"
+    "def multiply(a: int, b: int) -> int:\n"
+    "    \"\"\"Return the product of two integers.\"\"\"\n"
+    "    return a * b\n"
+)
+
+
+def test_tokenize_splits_identifiers():
+    assert tokenize("parse_iso_date parseISODate HTTPServer") == [
+        "parse", "iso", "date", "parse", "isodate", "httpserver"
+    ]
+    assert tokenize("camelCaseName") == ["camel", "case", "name"]
+
+
+def test_index_ranks_and_updates_incrementally():
+    """Name matches outrank prose, prefixes match and removals take effect at once."""
+    index = SearchIndex()
+    index.add("dates_1", "parse_iso_date", "Parse a date.", "Normalise a timestamp.", ["text"])
+    index.add("math_1", "multiply", "Multiply numbers.", "Return the product.", ["a", "b"])
+    index.add("notes_1", "summarise", "Summarise text, e.g. a date range.", "", ["text"])
+
+    results = index.search("date")
+    assert [r["module"] for r in results] == ["dates_1", "notes_1"]
+    assert index.search("mult")[0]["tool_name"] == "multiply"
+    assert index.search("product", limit=1)[0]["module"] == "math_1"
+    assert index.search("") == [] and index.search("zzz") == []
+
+    index.add("math_1", "divide", "Divide numbers.", "", ["a", "b"])
+    assert index.search("multiply") == []
+    assert index.remove("dates_1") is True and index.remove("dates_1") is False
+    assert [r["module"] for r in index.search("date")] == ["notes_1"]
+    assert len(index) == 2
+
+
+def test_index_search_is_fast_with_many_tools():
+    index = SearchIndex()
+    for i in range(5000):
+        index.add(f"mod_{i}", f"tool_{i}_convert", f"Convert unit {i} to metric.", "Conversion helper.", ["value"])
+    started = time.perf_counter()
+    for _ in range(10):
+        results = index.search("convert metric 4999", limit=5)
+    assert (time.perf_counter() - started) / 10 < 0.2
+    assert results[0]["module"] == "mod_4999"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("server", [{"USE_MOCK_LLM": "1", "MCPFORGE_CURATION": "local"}], indirect=True)
+async def test_search_over_mcp_and_http(server):
+    async with Client(f"{BASE_URL}/sse") as client:
+        created = (await client.call_tool("collector.ingest_python", {"snippet_name": "util", "code": SNIPPET})).data
+        assert len(created["created"]) == 2
+        results = (await client.call_tool("collector.search", {"query": "calendar day", "limit": 5})).data["results"]
+        assert results[0]["tool_name"] == "parse_iso_date"
+
+        modules = {r["tool_name"]: r["module"] for r in (await client.call_tool("collector.search", {"query": "product iso"})).data["results"]}
+        await client.call_tool("collector.remove", {"module_name": modules["multiply"]})
+
+    async with httpx.AsyncClient() as http:
+        resp = await http.get(f"{BASE_URL}/tools/search", params={"q": "product"})
+        assert resp.status_code == 200 and resp.json()["results"] == []
+        resp = await http.get(f"{BASE_URL}/tools/search", params={"q": "date"})
+        assert [r["tool_name"] for r in resp.json()["results"]] == ["parse_iso_date"]
@@ -23,3 +23,37 @@ async def test_forge_health(server):
         # The health check returns a dictionary with server info.
         assert isinstance(response.data, str)
         assert "ok" in response.data
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("server", [{"MCP_TRANSPORT": "sse,streamable-http"}], indirect=True)
+async def test_streamable_http_alongside_sse(server):
+    """Both transports are served on the same port when selected."""
+    for url in (f"http://{TEST_HOST}:{TEST_PORT}/mcp/", f"http://{TEST_HOST}:{TEST_PORT}/sse"):
+        async with Client(url) as client:
+            response = await client.call_tool("collector.list")
+            assert response.data == []
+
+
+@pytest.mark.asyncio
+async def test_sse_only_transport(server):
+    """With ``MCP_TRANSPORT=sse`` the streamable HTTP endpoint is not mounted."""
+    import httpx
+
+    async with httpx.AsyncClient() as client:
+        resp = await client.post(f"http://{TEST_HOST}:{TEST_PORT}/mcp/", json={})
+        assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("server", [{"MCPFORGE_HEADLESS": "1", "MCP_TRANSPORT": "all"}], indirect=True)
+async def test_headless_mode(server):
+    """Headless mode serves MCP and ``/health`` but not the web UI."""
+    import httpx
+
+    async with Client(f"http://{TEST_HOST}:{TEST_PORT}/mcp/") as client:
+        response = await client.call_tool("forge_health")
+        assert "ok" in response.data
+    async with httpx.AsyncClient() as http:
+        assert (await http.get(f"http://{TEST_HOST}:{TEST_PORT}/health")).status_code == 200
+        assert (await http.get(f"http://{TEST_HOST}:{TEST_PORT}/")).status_code == 404
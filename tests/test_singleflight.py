@@ -0,0 +1,130 @@
+import asyncio
+import threading
+
+import pytest
+from fastmcp import Client
+
+from app.singleflight import SingleFlight, content_key
+
+TEST_HOST = "127.0.0.1"
+TEST_PORT = 8765
+BASE_URL = f"http://{TEST_HOST}:{TEST_PORT}"
+
+ADD_SNIPPET = "def add(a: int, b: int) -> int:\n    return a + b\n"
+
+
+def _race(flights: SingleFlight, key: str, fn, callers: int = 4) -> list:
+    """Start ``callers`` threads on ``key`` and collect their outcomes."""
+    outcomes: list = []
+    lock = threading.Lock()
+
+    def _call():
+        try:
+            outcome = flights.do(key, fn)
+        except Exception as exc:
+            outcome = exc
+        with lock:
+            outcomes.append(outcome)
+
+    threads = [threading.Thread(target=_call) for _ in range(callers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    return outcomes
+
+
+def test_single_flight_runs_shared_work_once():
+    """Concurrent callers with the same key share one execution and its result."""
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return {"value": 42}
+
+    threading.Timer(0.2, release.set).start()
+    outcomes = _race(flights, content_key("same"), work)
+    assert len(calls) == 1
+    assert all(result == {"value": 42} for result, _ in outcomes)
+    assert sorted(shared for _, shared in outcomes) == [False, True, True, True]
+    assert flights.in_flight() == 0
+    # Nothing is cached once the flight has landed.
+    assert flights.do(content_key("same"), lambda: {"value": 0}) == ({"value": 0}, False)
+
+
+def test_single_flight_propagates_errors():
+    """A failing leader raises the same error in every waiting caller."""
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def work():
+        release.wait(5)
+        raise ValueError("boom")
+
+    threading.Timer(0.2, release.set).start()
+    outcomes = _race(flights, content_key("bad"), work, callers=3)
+    assert len(outcomes) == 3
+    assert all(isinstance(o, ValueError) for o in outcomes)
+
+
+def test_content_key_is_stable():
+    assert content_key("ingest", "a", "code") == content_key("ingest", "a", "code")
+    assert content_key("ingest", "a", "code") != content_key("ingest", "b", "code")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "server",
+    [{"USE_MOCK_LLM": "1", "MOCK_LLM_DELAY": "1", "MCPFORGE_CURATION": "llm"}],
+    indirect=True,
+)
+async def test_identical_ingests_are_coalesced(server):
+    """Concurrent identical ingests run the pipeline once and share its result."""
+    async def _ingest():
+        async with Client(f"{BASE_URL}/sse") as client:
+            response = await client.call_tool(
+                "collector.ingest_python", {"snippet_name": "dup", "code": ADD_SNIPPET}
+            )
+            return response.data
+
+    results = await asyncio.gather(*[_ingest() for _ in range(4)])
+    assert results[0]["created"] and all(r["created"] == results[0]["created"] for r in results)
+    assert sum(1 for r in results if not r.get("shared")) == 1
+
+
+def test_job_and_sync_ingest_of_same_snippet_do_not_deadlock(monkeypatch):
+    """A queued job and a sync ingest of the same snippet share one run with a single slot."""
+    import time
+    from app.server import build_server
+
+    monkeypatch.setenv("USE_MOCK_LLM", "1")
+    monkeypatch.setenv("MOCK_LLM_DELAY", "0.5")
+    monkeypatch.setenv("MCPFORGE_CURATION", "llm")
+    monkeypatch.setenv("MCPFORGE_INGEST_CONCURRENCY", "1")
+    mcp = build_server(registry_backend="memory")
+    other = "def sub(a: int, b: int) -> int:\n    return a - b\n"
+
+    busy = threading.Thread(target=mcp.ingest_snippet, args=("busy", other), daemon=True)
+    busy.start()
+    time.sleep(0.1)  # ``busy`` holds the only slot
+    job_id = mcp.submit_ingest("k", ADD_SNIPPET)
+    time.sleep(0.1)
+    results: list = []
+    sync = threading.Thread(target=lambda: results.append(mcp.ingest_snippet("k", ADD_SNIPPET)), daemon=True)
+    sync.start()
+
+    sync.join(10)
+    busy.join(10)
+    assert not sync.is_alive(), "sync ingest deadlocked"
+    deadline = time.time() + 10
+    while mcp.jobs.get(job_id)["status"] in ("queued", "running") and time.time() < deadline:
+        time.sleep(0.02)
+    job = mcp.jobs.get(job_id)
+    assert job["status"] == "succeeded"
+    assert results[0]["created"] == job["result"]["created"]
+    assert mcp.admission.ingest_gate.pending == 0
+    # The finished job is forgotten, so a new submission gets a new job
+    assert mcp.submit_ingest("k", ADD_SNIPPET) != job_id
@@ -0,0 +1,123 @@
+import subprocess
+import sys
+
+import httpx
+import pytest
+from fastmcp import Client
+
+from app.registry import write_tool_module
+from app.snapshot import SnapshotError, export_snapshot, read_snapshot
+from app.storage import FileRegistryStore, MemoryRegistryStore
+
+TEST_HOST = "127.0.0.1"
+TEST_PORT = 8765
+BASE_URL = f"http://{TEST_HOST}:{TEST_PORT}"
+
+ADD_SNIPPET = "def add(a: int, b: int) -> int:\n    return a + b\n"
+
+
+def _forge(modules, bytecode_magic=None) -> bytes:
+    """Build a well-checksummed snapshot around an arbitrary payload."""
+    import hashlib
+    import json
+    import zlib
+    payload = zlib.compress(json.dumps({"modules": modules}).encode("utf-8"))
+    header = {"format": 1, "size": len(payload), "sha256": hashlib.sha256(payload).hexdigest(),
+              "bytecode_magic": bytecode_magic}
+    return b"MCPFORGE-SNAPSHOT 1\n%s\n%s" % (json.dumps(header).encode("utf-8"), payload)
+
+
+def _store_with_tools(store, count: int = 3):
+    for i in range(count):
+        write_tool_module(
+            store, f"math_{i}", ADD_SNIPPET, "add", f"add_{i}", "Add numbers", [("a", "int"), ("b", "int")], {"a": 1, "b": 2}
+        )
+    return store
+
+
+def test_snapshot_round_trip_with_bytecode():
+    """A snapshot carries source, metadata and reusable bytecode for every module."""
+    store = _store_with_tools(MemoryRegistryStore())
+    entries = read_snapshot(export_snapshot(store))
+    assert [e["name"] for e in entries] == ["math_0", "math_1", "math_2"]
+    assert entries[0]["source"] == store.read_source("math_0")
+    assert entries[0]["meta"] == store.read_meta("math_0")
+    assert entries[0]["code"] is not None
+    assert all(e["code"] is None for e in read_snapshot(export_snapshot(store, include_bytecode=False)))
+
+
+def test_snapshot_rejects_damaged_archives():
+    blob = export_snapshot(_store_with_tools(MemoryRegistryStore(), 1))
+    with pytest.raises(SnapshotError, match="checksum"):
+        read_snapshot(blob[:-1] + bytes([blob[-1] ^ 0xFF]))
+    with pytest.raises(SnapshotError, match="not an MCPForge"):
+        read_snapshot(b"PK\x03\x04 something else")
+    # Malformed headers: non-numeric version, non-object header JSON
+    for bad in (b"MCPFORGE-SNAPSHOT x\n{}\npayload", b"MCPFORGE-SNAPSHOT 1\n[]\npayload"):
+        with pytest.raises(SnapshotError, match="not an MCPForge"):
+            read_snapshot(bad)
+
+
+def test_snapshot_rejects_malformed_entries():
+    """Entries are checked before anything touches the store."""
+    import importlib.util
+    magic = importlib.util.MAGIC_NUMBER.hex()
+    good = {"name": "calc", "source": ADD_SNIPPET, "meta": {}}
+    assert read_snapshot(_forge([good]))[0]["name"] == "calc"
+    for modules in ("x", [1], [{"source": ADD_SNIPPET}], [{**good, "meta": "x"}], [{**good, "source": None}]):
+        with pytest.raises(SnapshotError, match="corrupt"):
+            read_snapshot(_forge(modules))
+    for name in ("../escaped", "a/b", "Calc", ""):
+        with pytest.raises(SnapshotError, match="invalid module name"):
+            read_snapshot(_forge([{**good, "name": name}]))
+    for bytecode in ("not base64!", "AAAA", "6QAAAA=="):
+        with pytest.raises(SnapshotError, match="corrupt bytecode"):
+            read_snapshot(_forge([{**good, "bytecode": bytecode}], magic))
+
+
+def test_file_store_write_many(tmp_path):
+    store = FileRegistryStore(str(tmp_path / "reg"))
+    store.write_many([("a", "A = 1\n", {"tool_name": "a"}), ("b", "B = 2\n", {"tool_name": "b"})])
+    assert store.modules() == ["a", "b"]
+    assert store.read_meta("b") == {"tool_name": "b"}
+    assert not list((tmp_path / "reg").glob("*.tmp"))
+
+
+def test_export_flag_and_startup_import(tmp_path):
+    """run.py --export-registry writes a snapshot that a new node imports at startup."""
+    from app.server import build_server
+
+    _store_with_tools(FileRegistryStore(str(tmp_path / "src")))
+    path = tmp_path / "registry.snapshot"
+    subprocess.run(
+        [sys.executable, "run.py", "--registry-dir", str(tmp_path / "src"), "--export-registry", str(path)],
+        check=True, capture_output=True,
+    )
+    mcp = build_server(registry_backend="memory", snapshot=str(path))
+    assert mcp.module_tool_map == {"math_0": "add_0", "math_1": "add_1", "math_2": "add_2"}
+    assert mcp.module_params == {name: {"a": 1, "b": 2} for name in mcp.module_tool_map}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("server", [{"USE_MOCK_LLM": "1"}], indirect=True)
+async def test_snapshot_endpoints(server):
+    """A snapshot downloaded from the admin endpoint restores removed tools in one upload."""
+    async with httpx.AsyncClient() as http:
+        resp = await http.post(f"{BASE_URL}/tools", data={"snippet_name": "calc", "code": ADD_SNIPPET})
+        module = resp.json()["created"][0]
+        resp = await http.get(f"{BASE_URL}/admin/snapshot")
+        assert resp.status_code == 200
+        blob = resp.content
+        await http.delete(f"{BASE_URL}/tools/{module}")
+
+        resp = await http.post(f"{BASE_URL}/admin/snapshot", content=blob)
+        assert resp.status_code == 200
+        assert resp.json()["imported"] == [module] and resp.json()["bytecode"] == 1
+        escaped = _forge([{"name": "../escaped", "source": ADD_SNIPPET, "meta": {}}])
+        for junk in (b"junk", b"MCPFORGE-SNAPSHOT x\n{}\n", b"MCPFORGE-SNAPSHOT 1\n[]\n", _forge("x"), escaped):
+            resp = await http.post(f"{BASE_URL}/admin/snapshot", content=junk)
+            assert resp.status_code == 400
+
+    async with Client(f"{BASE_URL}/sse") as client:
+        assert (await client.call_tool("collector.list")).data == [module]
+        assert (await client.call_tool("add", {"a": 1, "b": 2})).content[0].text == "3"
@@ -0,0 +1,76 @@
+"""
+Import-time profile of server startup.
+
+Each test runs a fresh interpreter with ``-X importtime`` and checks both
+which modules were imported and how long the imports took.  Only imports made
+by the code under test count; interpreter startup (``site`` and friends) does
+not.  Budgets are twice the baselines measured on a development machine, so
+a change that doubles startup time fails.  They can be adjusted for slow CI
+machines with ``MCPFORGE_IMPORT_BUDGET_MS`` (importing ``app.server``) and
+``MCPFORGE_STARTUP_BUDGET_MS`` (building the headless app).
+"""
+
+import os
+import subprocess
+import sys
+
+WEB_STACK = {"fastapi", "jinja2", "openai"}
+MARKER = "-- mcpforge startup --"
+# Measured baselines (best of three runs); budgets allow twice these.
+IMPORT_BASELINE_MS = 2.0
+STARTUP_BASELINE_MS = 1350.0
+
+
+def _import_profile(code: str) -> list:
+    """Return ``(name, cumulative_us)`` for every import made by ``code``, in order.
+
+    Names keep their ``-X importtime`` indentation, so top-level imports are
+    the ones without leading spaces.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys; sys.stderr.write({MARKER!r} + '\\n'); {code}"],
+        capture_output=True, text=True, check=True,
+        env=dict(os.environ, MCPFORGE_REGISTRY_BACKEND="memory"),
+    )
+    lines = proc.stderr.splitlines()
+    rows = []
+    for line in lines[lines.index(MARKER) + 1:]:
+        if line.startswith("import time:") and "cumulative" not in line:
+            _self_us, cumulative, name = line.split("|")
+            rows.append((name[1:], int(cumulative)))
+    return rows
+
+
+def _modules(rows: list) -> set:
+    return {name.strip() for name, _ in rows}
+
+
+def _top_level_ms(rows: list) -> float:
+    return sum(us for name, us in rows if not name.startswith(" ")) / 1000
+
+
+def _budget(var: str, baseline_ms: float) -> float:
+    return float(os.getenv(var) or 2 * baseline_ms)
+
+
+def test_server_module_import_is_light():
+    """Importing ``app.server`` defers FastMCP, OpenAI and the web stack."""
+    runs = [_import_profile("import app.server") for _ in range(3)]
+    assert not {m for m in _modules(runs[0]) if m.split(".")[0] in WEB_STACK | {"fastmcp"}}
+    assert min(map(_top_level_ms, runs)) < _budget("MCPFORGE_IMPORT_BUDGET_MS", IMPORT_BASELINE_MS)
+
+
+def test_headless_startup_skips_web_stack():
+    """The MCP-only app never imports FastAPI, Jinja2 or OpenAI and starts within budget."""
+    code = "from app.server import build_headless_app; build_headless_app()"
+    runs = [_import_profile(code) for _ in range(3)]
+    assert not {m for m in _modules(runs[0]) if m.split(".")[0] in WEB_STACK}
+    assert min(map(_top_level_ms, runs)) < _budget("MCPFORGE_STARTUP_BUDGET_MS", STARTUP_BASELINE_MS)
+
+
+def test_openai_client_is_shared(monkeypatch):
+    """The OpenAI client is constructed once and reused."""
+    from app.llm import get_client
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    assert get_client() is get_client()
@@ -0,0 +1,77 @@
+import asyncio
+
+import httpx
+import pytest
+from fastmcp import Client
+
+TEST_HOST = "127.0.0.1"
+TEST_PORT = 8765
+BASE_URL = f"http://{TEST_HOST}:{TEST_PORT}"
+
+ADD_SNIPPET = "def add(a: int, b: int) -> int:\n    return a + b\n"
+SLOW_SNIPPET = (
+    "def add(a: int, b: int) -> int:\n"
+    "    import time\n"
+    "    time.sleep(1)\n"
+    "    return a + b + 1000\n"
+)
+PLUS_SNIPPET = "def add(a: int, b: int) -> int:\n    return a + b + 100\n"
+
+
+async def _add(client: Client, a: int = 1, b: int = 2) -> str:
+    return (await client.call_tool("add", {"a": a, "b": b})).content[0].text
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("server", [{"USE_MOCK_LLM": "1"}], indirect=True)
+async def test_update_swaps_in_place_and_rolls_back(server):
+    """Updates keep the tool and module names, let in-flight calls drain and can be undone."""
+    async with Client(f"{BASE_URL}/sse") as client:
+        created = (await client.call_tool("collector.ingest_python", {"snippet_name": "calc", "code": ADD_SNIPPET})).data
+        modules = created["created"]
+
+        update = await client.call_tool("collector.update", {"tool_name": "add", "code": SLOW_SNIPPET})
+        assert update.data["version"] == 2 and update.data["previous_versions"] == 1
+
+        # A call on the slow version is in flight while the next update lands.
+        async with Client(f"{BASE_URL}/sse") as other:
+            slow = asyncio.create_task(_add(other))
+            await asyncio.sleep(0.3)
+            await client.call_tool("collector.update", {"tool_name": "add", "code": PLUS_SNIPPET})
+            assert await _add(client) == "103"
+            assert await slow == "1003"
+
+        assert (await client.call_tool("collector.list")).data == modules
+
+        rollback = (await client.call_tool("collector.rollback", {"tool_name": "add"})).data
+        assert rollback["version"] == 2
+        await client.call_tool("collector.rollback", {"tool_name": "add"})
+        assert await _add(client) == "3"
+        result = await client.call_tool("collector.rollback", {"tool_name": "add"}, raise_on_error=False)
+        assert result.is_error and "no previous version" in result.content[0].text
+
+        result = await client.call_tool(
+            "collector.update", {"tool_name": "add", "code": "def add(a):\n    return open(a).read()\n"},
+            raise_on_error=False,
+        )
+        assert result.is_error and "unsafe" in result.content[0].text
+        assert await _add(client) == "3"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("server", [{"USE_MOCK_LLM": "1"}], indirect=True)
+async def test_update_over_http(server):
+    async with httpx.AsyncClient() as http:
+        resp = await http.post(f"{BASE_URL}/tools", data={"snippet_name": "calc", "code": ADD_SNIPPET})
+        module = resp.json()["created"][0]
+        resp = await http.post(f"{BASE_URL}/tools/{module}/rollback")
+        assert resp.status_code == 409
+        resp = await http.put(f"{BASE_URL}/tools/{module}", json={"code": PLUS_SNIPPET, "description": "Add plus 100."})
+        assert resp.status_code == 200 and resp.json()["module"] == module
+        resp = await http.post(f"{BASE_URL}/tools/{module}/test")
+        assert resp.json()["output"]["result"] == "103"
+        resp = await http.put(f"{BASE_URL}/tools/missing", json={"code": PLUS_SNIPPET})
+        assert resp.status_code == 404
+        for body in (b"[1]", b"{oops"):
+            resp = await http.put(f"{BASE_URL}/tools/{module}", content=body, headers={"content-type": "application/json"})
+            assert resp.status_code == 400
@@ -0,0 +1,96 @@
+import pytest
+from fastmcp import Client
+
+from app.validation import ArgumentError, compile_validator, input_schema, wrapper_annotation
+
+TEST_HOST = "127.0.0.1"
+TEST_PORT = 8765
+BASE_URL = f"http://{TEST_HOST}:{TEST_PORT}"
+
+SCALE_SNIPPET = (
+    "def scale(values: list[float], factor: float, label: str | None) -> str:\n"
+    "    return f'{label}: {[v * factor for v in values]}'\n"
+)
+
+
+def test_validator_coerces_lax_values():
+    """Numeric strings, integral floats and boolean words are coerced."""
+    validate = compile_validator(
+        [("a", "int"), ("b", "Optional[List[float]]"), ("c", "str | int"), ("d", "bool"), ("e", "Dict[str, int]")]
+    )
+    args = validate({"a": "3", "b": [1, "2.5"], "c": "1", "d": "yes", "e": {"x": 2.0}})
+    assert args == {"a": 3, "b": [1.0, 2.5], "c": "1", "d": True, "e": {"x": 2}}
+    assert validate({"a": 3, "b": None, "c": 5, "d": 0, "e": {}})["b"] is None
+
+
+def test_validator_reports_every_problem():
+    validate = compile_validator([("a", "int"), ("b", "list[float]"), ("c", "Any")])
+    with pytest.raises(ArgumentError) as excinfo:
+        validate({"a": "x", "b": ["q"], "z": 1})
+    message = str(excinfo.value)
+    assert "a: expected integer" in message
+    assert "b: item 0: expected number" in message
+    assert "c: missing required argument" in message
+    assert "unexpected argument(s): z" in message
+
+
+def test_input_schema_from_annotations():
+    schema = input_schema([("a", "int"), ("b", "Optional[list[float]]"), ("c", "np.ndarray")])
+    assert schema["properties"] == {
+        "a": {"type": "integer"},
+        "b": {"anyOf": [{"type": "array", "items": {"type": "number"}}, {"type": "null"}]},
+        "c": {},
+    }
+    assert schema["required"] == ["a", "b", "c"]
+    assert schema["additionalProperties"] is False
+
+
+def test_wrapper_declares_the_stored_annotations():
+    """Wrapper signatures and validation metadata come from the same annotation strings."""
+    import inspect
+    import types
+
+    from app.registry import render_tool_module
+    from app.server import _parse_functions
+
+    code = "class Point:\n    pass\n" + SCALE_SNIPPET.replace("label: str | None", "label: str | None, at: Point")
+    (func,) = _parse_functions(code)
+    assert func["args"] == [("values", "list[float]"), ("factor", "float"), ("label", "str | None"), ("at", "Point")]
+    text, meta = render_tool_module(code, "scale", "scale", "Scale values.", func["args"])
+    assert meta["arg_spec"] == [list(pair) for pair in func["args"]]
+
+    mod = types.ModuleType("generated")
+    exec(text, mod.__dict__)
+    wrapped = []
+    mod.register(types.SimpleNamespace(tool=lambda **kw: wrapped.append))
+    params = inspect.signature(wrapped[0]).parameters
+    assert [inspect.formatannotation(p.annotation) for p in params.values()] == ["list[float]", "float", "str | None", "Any"]
+    assert wrapper_annotation("np.ndarray") == wrapper_annotation("'Point'") == "Any"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("server", [{"USE_MOCK_LLM": "1"}], indirect=True)
+async def test_collected_tool_validates_arguments(server):
+    """Collected tools publish an accurate schema and reject bad calls up front."""
+    async with Client(f"{BASE_URL}/sse") as client:
+        await client.call_tool("collector.ingest_python", {"snippet_name": "scale", "code": SCALE_SNIPPET})
+        tool = next(t for t in await client.list_tools() if t.name == "scale")
+        assert tool.inputSchema["properties"]["values"] == {"type": "array", "items": {"type": "number"}}
+        assert tool.inputSchema["properties"]["label"] == {"anyOf": [{"type": "string"}, {"type": "null"}]}
+
+        response = await client.call_tool("scale", {"values": [1, 2], "factor": 3, "label": None})
+        assert response.content[0].text == "None: [3.0, 6.0]"
+
+        response = await client.call_tool(
+            "scale", {"values": "nope", "factor": 1, "label": "x"}, raise_on_error=False
+        )
+        assert response.is_error
+
+        # Batches run the same validator, coercing lax values per item
+        response = await client.call_tool(
+            "collector.call_batch",
+            {"tool_name": "scale", "items": [{"values": ["2"], "factor": "1.5", "label": "x"}, {"values": 1}]},
+        )
+        first, second = response.data["results"]
+        assert first == {"ok": True, "result": "x: [3.0]"}
+        assert second["error"].startswith("ArgumentError: values: expected array")
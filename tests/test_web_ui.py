@@ -13,6 +13,7 @@ async def test_health_endpoint(server):
         resp = await client.get(f"{BASE_URL}/health")
         assert resp.status_code == 200
         assert "ok" in resp.text.lower()
+        assert "ingest=0/4+16" in resp.text
 
 
 @pytest.mark.asyncio